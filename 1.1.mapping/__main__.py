@@ -11,12 +11,23 @@ from pyrml.functions import *
 
 from rdflib import Graph 
 
+from streaming_mapper import stream_mapping, parallel_mapping, prepend_ontology
+from delta_etl import delta_mapping
+
 # Namespaces
 parser = ArgumentParser()
 parser.add_argument("-o", "--output", dest="output",
             help="Output file. If no choice is provided then standard output is assumed as default.", metavar="RDF out file")
 parser.add_argument("-m", action="store_true", default=False,
             help="Enable conversion based on multiproccessing for fastening the computation.")
+parser.add_argument("-w", "--workers", dest="workers", type=int, default=None,
+            help="Number of worker processes used with -m (default: number of CPUs).")
+parser.add_argument("-s", "--stream", dest="stream", action="store_true", default=False,
+            help="Stream the CSV sources row by row straight to N-Triples instead of building an in-memory graph.")
+parser.add_argument("-t", "--turtle", dest="turtle", action="store_true", default=False,
+            help="Also pretty-print the KG and the merged KG as Turtle (slow on large graphs).")
+parser.add_argument("-i", "--incremental", dest="manifest", default=None, metavar="MANIFEST",
+            help="Only map appointments that changed since the run recorded in this manifest and write add/remove patches.")
 parser.add_argument("input", help="The input RML mapping file for enabling RDF conversion.")
 parser.add_argument("ontology", help="The main ontology to create the generated KG.")
         
@@ -33,32 +44,83 @@ def execute_mapping():
     g = rml_converter.convert(args.input) 
     return g
 
+def execute_streaming_mapping(output):
+    """
+    Execute the mapping without an rdflib Graph.
+    Rows are read one at a time and written to <output>.n3 as N-Triples,
+    so memory use does not grow with the size of the schedule.
+    With -m the source CSV is split into row ranges mapped on a process pool.
+    """
+    dest_folder = Path(output).parent
+    
+    if not os.path.exists(dest_folder):
+        os.makedirs(dest_folder)
+
+    if args.m:
+        return parallel_mapping(args.input, output + '.n3', args.workers)
+    return stream_mapping(args.input, output + '.n3')
+
+def execute_delta_mapping(output):
+    """
+    Execute the mapping incrementally against the manifest given with -i.
+    Writes <output>_delta_add.n3, <output>_delta_remove.n3 and the SPARQL
+    Update patch <output>_delta.ru for new, changed and cancelled appointments.
+    """
+    dest_folder = Path(output).parent
+    
+    if not os.path.exists(dest_folder):
+        os.makedirs(dest_folder)
+
+    return delta_mapping(args.input, args.manifest, output)
+
 def store(g, output):    
     """
-    Store the generated RDF graph in Turtle and N3 formats.
+    Store the generated RDF graph in N-Triples format.
     This function takes the RDF graph and the output file path as arguments,
-    and writes the graph to the specified file in both formats.
+    and writes the graph to <output>.n3.
     """
     dest_folder = Path(output).parent
     
     if not os.path.exists(dest_folder):
         os.makedirs(dest_folder)
-        
-    with codecs.open(output + '.ttl', 'w', encoding='utf8') as out_file:
-        out_file.write(g.serialize(format='turtle'))
 
     with codecs.open(output + '.n3', 'w', encoding='utf8') as out_file:
         out_file.write(g.serialize(format='nt'))
 
+def merge_ontology(output):
+    """
+    Merge the ontology into the generated KG without a second in-memory graph.
+    N-Triples is line based, so <output>_merged.n3 is just the ontology
+    serialized as N-Triples followed by a byte copy of <output>.n3.
+    Only the (small) ontology is parsed.
+    """
+    prepend_ontology(args.ontology, output + '.n3', output + '_merged.n3')
+
+def store_turtle(output):
+    """
+    Pretty-print <output>.n3 as <output>.ttl.
+    Turtle serialization is by far the slowest step, so it only runs with -t.
+    """
+    g = Graph()
+    g.parse(output + '.n3', format='nt')
+
+    with codecs.open(output + '.ttl', 'w', encoding='utf8') as out_file:
+        out_file.write(g.serialize(format='turtle'))
+
 if __name__ == '__main__':
-    
-    g = execute_mapping()
-    store(g, args.output)
 
-    og = Graph()
-    og.parse(args.ontology)
+    if args.manifest:
+        # The ontology does not change between runs, so there is nothing to merge
+        execute_delta_mapping(args.output)
+    else:
+        if args.stream or args.m:
+            execute_streaming_mapping(args.output)
+        else:
+            g = execute_mapping()
+            store(g, args.output)
 
-    for triple in g.triples((None, None, None)):
-        og.add(triple)
+        merge_ontology(args.output)
 
-    store(og, args.output + '_merged')
+        if args.turtle:
+            store_turtle(args.output)
+            store_turtle(args.output + '_merged')
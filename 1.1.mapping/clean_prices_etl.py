@@ -1,6 +1,19 @@
 import pandas as pd
+import numpy as np
 import re
 
+from argparse import ArgumentParser
+
+PRICE_COLUMNS = ["Appointment Price", "Amount Paid Online"]
+
+# Human-readable time column → ISO 8601 column mapped as xsd:dateTime
+TIME_COLUMNS = {"Start Time": "Start DateTime", "End Time": "End DateTime"}
+TIME_FORMAT = "%B %d, %Y %H:%M"
+
+# Ordered class-type rule table: the first row whose keywords all occur in "Type" wins
+CATEGORY_RULES_PATH = "mappings/class_categories.csv"
+CATEGORY_COLUMNS = ["Category", "Category Label", "Counted Per"]
+
 def clean_price(value):
     """
     Normalize messy currency strings to decimal format (e.g. 1349.00)
@@ -29,17 +42,134 @@ def clean_price(value):
     except:
         return "0.00"
 
+def clean_price_series(series):
+    """
+    Vectorized equivalent of clean_price for a whole column.
+    Applies the same rules with pandas string methods and pd.to_numeric,
+    so it returns exactly the strings clean_price would, without a
+    Python call per cell.
+    """
+    missing = series.isna()
+    val = series.astype(str).str.strip().str.replace(" ", "", regex=False)
+
+    has_comma = val.str.contains(",", regex=False)
+    has_dot = val.str.contains(".", regex=False)
+
+    # 1. "1,349.00" → "1349.00"
+    val = val.mask(has_comma & has_dot, val.str.replace(",", "", regex=False))
+    # 2. "1826,65" → "1826.65"
+    val = val.mask(has_comma & ~has_dot, val.str.replace(",", ".", regex=False))
+
+    # Remove anything except digits and dot
+    val = val.str.replace(r"[^0-9.]", "", regex=True)
+
+    # Unparseable values ("", "1.2.3") become NaN and fall back to 0.00
+    numbers = pd.to_numeric(val, errors="coerce").astype("float64")
+    numbers = numbers.mask(missing | numbers.isna(), 0.0)
+
+    return pd.Series(np.char.mod("%.2f", numbers.to_numpy()), index=series.index, dtype=object)
+
+def clean_prices(df, engine="vectorized"):
+    """
+    Clean the price columns of a schedule DataFrame in place and return it.
+    engine="vectorized" uses clean_price_series, engine="apply" keeps the
+    original per-row clean_price.
+    """
+    for column in PRICE_COLUMNS:
+        if engine == "apply":
+            df[column] = df[column].apply(clean_price)
+        else:
+            df[column] = clean_price_series(df[column])
+    return df
+
+def normalize_times(df):
+    """
+    Add ISO 8601 copies of the start and end times ("February 1, 2025 10:00"
+    → "2025-02-01T10:00:00") next to the original columns, so the KG gets
+    sortable xsd:dateTime literals. Unparseable times are left empty.
+    """
+    for column, iso_column in TIME_COLUMNS.items():
+        times = pd.to_datetime(df[column], format=TIME_FORMAT, errors="coerce")
+        df[iso_column] = times.dt.strftime("%Y-%m-%dT%H:%M:%S").fillna("")
+    return df
+
+def load_category_rules(path=CATEGORY_RULES_PATH):
+    """
+    Read the class category rule table as a list of
+    (keywords, category, label, counted per) tuples, in file order.
+    A row without keywords matches everything and acts as the default.
+    """
+    rules = pd.read_csv(path, dtype=str, keep_default_na=False)
+    return [
+        (row["Keywords"].lower().split(), row["Category"], row["Label"], row["Counted Per"])
+        for _, row in rules.iterrows()
+    ]
+
+def categorize_classes(df, rules):
+    """
+    Add the normalized class category of each appointment ("Category",
+    "Category Label", "Counted Per"), so the mapping can link every
+    ski:ClassType to a category resource instead of queries matching
+    strings. One vectorized pass per rule.
+    """
+    types = df["Type"].fillna("").astype(str).str.lower()
+    unmatched = pd.Series(True, index=df.index)
+    for column in CATEGORY_COLUMNS:
+        df[column] = ""
+    for keywords, category, label, counted_per in rules:
+        match = unmatched.copy()
+        for keyword in keywords:
+            match &= types.str.contains(keyword, regex=False)
+        df.loc[match, CATEGORY_COLUMNS] = [category, label, counted_per]
+        unmatched &= ~match
+    return df
+
+def clean_schedule(df, engine="vectorized", rules=None):
+    """
+    Every cleaning stage, in order: prices, timestamps, then class categories.
+    """
+    df = normalize_times(clean_prices(df, engine))
+    return categorize_classes(df, rules) if rules else df
+
+def run_etl(input_path, output_path, chunksize=None, engine="vectorized", rules=None):
+    """
+    Read the raw schedule, clean it and write the cleaned CSV.
+    With a chunksize the file is streamed through read_csv(chunksize=...)
+    and appended chunk by chunk, so memory stays flat whatever the file size.
+    Returns the number of rows written.
+    """
+    if not chunksize:
+        df = clean_schedule(pd.read_csv(input_path), engine, rules)
+        df.to_csv(output_path, index=False)
+        return len(df)
+
+    # Read every column as text so a chunk never gets a different dtype than
+    # the whole file would (e.g. an all-numeric slice of Phone losing zeros).
+    reader = pd.read_csv(input_path, chunksize=chunksize, dtype=str, keep_default_na=False)
+    rows = 0
+    for i, chunk in enumerate(reader):
+        clean_schedule(chunk, engine, rules).to_csv(output_path, index=False, mode="w" if i == 0 else "a", header=(i == 0))
+        rows += len(chunk)
+    return rows
+
 # === ETL PROCESS ===
 INPUT_PATH = "datasources/scheduleFaked.csv"
 OUTPUT_PATH = "datasources/schedule_cleaned.csv"
 
-df = pd.read_csv(INPUT_PATH)
-
-# Clean price columns
-df["Appointment Price"] = df["Appointment Price"].apply(clean_price)
-df["Amount Paid Online"] = df["Amount Paid Online"].apply(clean_price)
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument("-i", "--input", dest="input", default=INPUT_PATH,
+                help="Raw schedule CSV to clean.")
+    parser.add_argument("-o", "--output", dest="output", default=OUTPUT_PATH,
+                help="Destination of the cleaned CSV.")
+    parser.add_argument("-c", "--chunksize", dest="chunksize", type=int, default=None,
+                help="Stream the input in chunks of this many rows instead of loading it at once.")
+    parser.add_argument("--engine", choices=["vectorized", "apply"], default="vectorized",
+                help="Price cleaning engine (default: vectorized).")
+    parser.add_argument("-r", "--rules", dest="rules", default=CATEGORY_RULES_PATH,
+                help="Class category rule table (CSV: Keywords, Category, Label, Counted Per).")
+    args = parser.parse_args()
 
-# Save cleaned file
-df.to_csv(OUTPUT_PATH, index=False)
+    run_etl(args.input, args.output, args.chunksize, args.engine, load_category_rules(args.rules))
 
-print(f"✅ Cleaned CSV saved to {OUTPUT_PATH}")
+    print(f"✅ Cleaned CSV saved to {args.output}")
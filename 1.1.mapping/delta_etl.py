@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+    Incremental (delta) mapping
+    Compares the cleaned schedule with a manifest of Appointment ID -> row hash
+    kept from the previous run, and writes only the triples to add and remove
+    for new, changed and cancelled appointments, as N-Triples files and as a
+    SPARQL Update patch (DELETE DATA / INSERT DATA).
+"""
+
+import csv
+import hashlib
+import json
+import logging
+import os
+
+from streaming_mapper import compile_mapping, maps_by_source, render_term, row_triples
+
+KEY_COLUMN = "Appointment ID"
+
+
+def row_hash(row):
+    """
+    Stable content hash of a CSV row, independent of column order.
+    """
+    return hashlib.sha1(json.dumps(row, sort_keys=True, ensure_ascii=False).encode("utf8")).hexdigest()
+
+
+def load_manifest(path):
+    """
+    Load the manifest of the previous run, or an empty one on the first run.
+    Each entry keeps the row hash plus the row itself, which is needed to
+    regenerate the triples of a changed or cancelled appointment.
+    """
+    if not os.path.isfile(path):
+        return {}
+    with open(path, "r", encoding="utf8") as f:
+        return json.load(f)["appointments"]
+
+
+def save_manifest(path, appointments):
+    """
+    Write the manifest atomically so an interrupted run keeps the old one.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf8") as f:
+        json.dump({"key": KEY_COLUMN, "appointments": appointments}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _triples(triples_maps, rows):
+    lines = set()
+    for row in rows:
+        for triples_map in triples_maps:
+            lines.update(row_triples(triples_map, row))
+    return lines
+
+
+def write_patch(output, added, removed):
+    """
+    Write <output>_delta_add.n3, <output>_delta_remove.n3 and <output>_delta.ru.
+    The .ru file can be POSTed as-is to Fuseki's /dataset/update endpoint.
+    """
+    with open(output + "_delta_add.n3", "w", encoding="utf8") as f:
+        f.writelines(added)
+    with open(output + "_delta_remove.n3", "w", encoding="utf8") as f:
+        f.writelines(removed)
+
+    with open(output + "_delta.ru", "w", encoding="utf8") as f:
+        if removed:
+            f.write("DELETE DATA {\n")
+            f.writelines(removed)
+            f.write("}")
+        if removed and added:
+            f.write(" ;\n")
+        if added:
+            f.write("INSERT DATA {\n")
+            f.writelines(added)
+            f.write("}")
+        f.write("\n")
+
+
+def delta_mapping(mapping_path, manifest_path, output):
+    """
+    Map only what changed since the last run and update the manifest.
+    Triples of a changed or cancelled appointment are removed unless an
+    unchanged row still produces them (e.g. the Person of a client who
+    has other bookings, or a shared ClassType).
+    Returns (new, changed, cancelled) appointment counts.
+    """
+    previous = load_manifest(manifest_path)
+    current = {}
+    triples_maps = []
+    new_rows, changed_rows, old_rows = [], [], []
+
+    for source, source_maps in maps_by_source(compile_mapping(mapping_path)).items():
+        triples_maps.extend(source_maps)
+        with open(source, "r", encoding="utf8", newline="") as f:
+            for row in csv.DictReader(f):
+                key = row[KEY_COLUMN]
+                if key in current:
+                    logging.warning("Duplicate %s %s, keeping the last row", KEY_COLUMN, key)
+                current[key] = {"hash": row_hash(row), "row": row}
+
+                if key not in previous:
+                    new_rows.append(row)
+                elif previous[key]["hash"] != current[key]["hash"]:
+                    changed_rows.append(row)
+                    old_rows.append(previous[key]["row"])
+
+    cancelled = [previous[key]["row"] for key in previous if key not in current]
+
+    added = _triples(triples_maps, new_rows + changed_rows)
+    removed = _triples(triples_maps, old_rows + cancelled) - added
+
+    # Keep triples whose subject is still produced by an unchanged row
+    if removed:
+        subjects = {line.split(" ", 1)[0] for line in removed}
+        for key, entry in current.items():
+            if key not in previous or previous[key]["hash"] != entry["hash"]:
+                continue
+            for triples_map in triples_maps:
+                if render_term(triples_map.subject, entry["row"]) in subjects:
+                    removed.difference_update(row_triples(triples_map, entry["row"]))
+
+    write_patch(output, sorted(added), sorted(removed))
+    save_manifest(manifest_path, current)
+
+    counts = (len(new_rows), len(changed_rows), len(cancelled))
+    logging.info("Delta: %d new, %d changed, %d cancelled appointments; +%d / -%d triples",
+                 *counts, len(added), len(removed))
+    return counts
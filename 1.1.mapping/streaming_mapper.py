@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+"""
+    Streaming RML mapper
+    Maps CSV logical sources straight to N-Triples on disk, one row at a time,
+    without building an rdflib Graph. Supports the subset of RML used by
+    kg_real_rml.ttl: subject/object templates, references, rr:class,
+    rr:predicate, rr:datatype and rr:termType.
+"""
+
+import csv
+import logging
+import os
+import re
+import shutil
+
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from urllib.parse import quote
+
+from rdflib import Graph, Namespace
+from rdflib.namespace import RDF
+
+RR = Namespace("http://www.w3.org/ns/r2rml#")
+RML = Namespace("http://semweb.mmlab.be/ns/rml#")
+
+# Number of recently written triples remembered to skip repeats
+# (e.g. the Person and ClassType triples of consecutive bookings).
+DEDUPE_WINDOW = 10000
+# Records parsed after a candidate split point before it is trusted
+RESYNC_RECORDS = 16
+
+TEMPLATE_REF = re.compile(r"\{([^}]+)\}")
+
+TermMap = namedtuple("TermMap", ["template", "reference", "constant", "term_type", "datatype", "language"])
+TriplesMap = namedtuple("TriplesMap", ["name", "source", "subject", "classes", "predicate_objects"])
+
+
+def _term_map(g, node, default_term_type):
+    template = g.value(node, RR.template)
+    reference = g.value(node, RML.reference)
+    constant = g.value(node, RR.constant)
+    term_type = g.value(node, RR.termType)
+    if term_type is None:
+        term_type = RR.Literal if reference is not None or g.value(node, RR.datatype) is not None else default_term_type
+    return TermMap(
+        template=str(template) if template is not None else None,
+        reference=str(reference) if reference is not None else None,
+        constant=constant,
+        term_type=term_type,
+        datatype=g.value(node, RR.datatype),
+        language=g.value(node, RR.language),
+    )
+
+
+def compile_mapping(mapping_path):
+    """
+    Parse the RML mapping file and return its TriplesMaps, sorted by name
+    so every run emits triples in the same order.
+    The mapping itself is tiny, so it is fine to load it with rdflib.
+    """
+    g = Graph()
+    g.parse(mapping_path, format="turtle")
+
+    triples_maps = []
+    for tm in g.subjects(RML.logicalSource, None):
+        source = g.value(g.value(tm, RML.logicalSource), RML.source)
+        subject_node = g.value(tm, RR.subjectMap)
+
+        predicate_objects = []
+        for pom in g.objects(tm, RR.predicateObjectMap):
+            object_node = g.value(pom, RR.objectMap)
+            for predicate in g.objects(pom, RR.predicate):
+                predicate_objects.append((predicate, _term_map(g, object_node, RR.IRI)))
+
+        triples_maps.append(TriplesMap(
+            name=str(tm),
+            source=str(source),
+            subject=_term_map(g, subject_node, RR.IRI),
+            classes=sorted(g.objects(subject_node, RR["class"])),
+            predicate_objects=sorted(predicate_objects, key=lambda po: str(po[0])),
+        ))
+
+    triples_maps.sort(key=lambda m: m.name)
+    logging.debug("Compiled %d TriplesMaps from %s", len(triples_maps), mapping_path)
+    return triples_maps
+
+
+def _quote_literal(value):
+    return (value.replace("\\", "\\\\").replace('"', '\\"')
+                 .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def render_term(term_map, row):
+    """
+    Return the N-Triples form of a term for one CSV row,
+    or None when a referenced cell is empty (no triple is produced then).
+    """
+    if term_map.constant is not None:
+        value = str(term_map.constant)
+    elif term_map.reference is not None:
+        value = row.get(term_map.reference)
+        if not value:
+            return None
+    else:
+        iri = term_map.term_type == RR.IRI
+        parts = []
+        last = 0
+        for match in TEMPLATE_REF.finditer(term_map.template):
+            cell = row.get(match.group(1))
+            if not cell:
+                return None
+            parts.append(term_map.template[last:match.start()])
+            parts.append(quote(cell, safe="") if iri else cell)
+            last = match.end()
+        parts.append(term_map.template[last:])
+        value = "".join(parts)
+
+    if term_map.term_type == RR.IRI:
+        return f"<{value}>"
+    if term_map.language is not None:
+        return f'"{_quote_literal(value)}"@{term_map.language}'
+    if term_map.datatype is not None:
+        return f'"{_quote_literal(value)}"^^<{term_map.datatype}>'
+    return f'"{_quote_literal(value)}"'
+
+
+def row_triples(triples_map, row):
+    """
+    Yield the N-Triples lines a TriplesMap produces for one CSV row.
+    """
+    subject = render_term(triples_map.subject, row)
+    if subject is None:
+        return
+
+    for cls in triples_map.classes:
+        yield f"{subject} <{RDF.type}> <{cls}> .\n"
+
+    for predicate, object_map in triples_map.predicate_objects:
+        obj = render_term(object_map, row)
+        if obj is not None:
+            yield f"{subject} <{predicate}> {obj} .\n"
+
+
+class RecentLines:
+    """
+    Bounded LRU set of recently written lines.
+    Keeps memory independent of dataset size while dropping most repeats.
+    """
+    def __init__(self, maxsize=DEDUPE_WINDOW):
+        self.maxsize = maxsize
+        self._lines = OrderedDict()
+
+    def seen(self, line):
+        if self.maxsize <= 0:
+            return False
+        if line in self._lines:
+            self._lines.move_to_end(line)
+            return True
+        self._lines[line] = None
+        if len(self._lines) > self.maxsize:
+            self._lines.popitem(last=False)
+        return False
+
+
+def map_rows(triples_maps, rows, out, dedupe_window=DEDUPE_WINDOW):
+    """
+    Write the triples of every row to the open text file `out`.
+    Returns the number of triples written.
+    """
+    recent = RecentLines(dedupe_window)
+    count = 0
+    for row in rows:
+        for triples_map in triples_maps:
+            for line in row_triples(triples_map, row):
+                if not recent.seen(line):
+                    out.write(line)
+                    count += 1
+    return count
+
+
+def maps_by_source(triples_maps):
+    """
+    Group TriplesMaps by logical source so each CSV is read only once.
+    """
+    grouped = OrderedDict()
+    for triples_map in triples_maps:
+        grouped.setdefault(triples_map.source, []).append(triples_map)
+    return grouped
+
+
+def stream_mapping(mapping_path, output_path, dedupe_window=DEDUPE_WINDOW):
+    """
+    Execute the RML mapping row by row and write N-Triples to output_path.
+    Memory depends on row width, not on the number of rows. Triples repeated
+    further apart than the dedupe window are written again, which is harmless
+    since RDF stores treat a graph as a set.
+    """
+    count = 0
+    with open(output_path, "w", encoding="utf8") as out:
+        for source, triples_maps in maps_by_source(compile_mapping(mapping_path)).items():
+            with open(source, "r", encoding="utf8", newline="") as f:
+                count += map_rows(triples_maps, csv.DictReader(f), out, dedupe_window)
+            logging.info("Mapped %s with %d TriplesMaps", source, len(triples_maps))
+
+    logging.info("Wrote %d triples to %s", count, output_path)
+    return count
+
+
+def _tracked_lines(f, end=None):
+    """
+    Yield decoded lines of a binary file, keeping f.consumed up to date with
+    the byte offset just past the last line handed out. The csv module pulls
+    lines lazily, so after each record f.consumed is that record's end.
+    """
+    f.consumed = f.tell()
+    for line in f:
+        if end is not None and f.consumed >= end:
+            return
+        f.consumed += len(line)
+        yield line.decode("utf8")
+
+
+def _is_record_start(f, offset, width):
+    """
+    Check that a line starting at `offset` starts a record: the next
+    RESYNC_RECORDS records parsed from there (fewer at the end of the file)
+    must each have `width` fields and an even number of quote characters.
+    A line inside a quoted multi-line cell fails this, because its quotes
+    pair up the wrong way round.
+    """
+    f.seek(offset)
+    pending = []
+
+    def lines():
+        for line in _tracked_lines(f):
+            pending.append(line)
+            yield line
+
+    try:
+        for record in islice(csv.reader(lines()), RESYNC_RECORDS):
+            quotes = sum(line.count('"') for line in pending)
+            pending.clear()
+            if len(record) != width or quotes % 2:
+                return False
+    except (csv.Error, UnicodeDecodeError):
+        return False
+    return True
+
+
+def _next_record_start(f, offset, width, end):
+    """
+    Byte offset of the first record start at or after `offset`, or `end`:
+    move to the start of the next line, then on line by line until a line
+    passes _is_record_start. Only a few lines around `offset` are read.
+    """
+    f.seek(offset - 1)
+    if f.read(1) != b"\n":
+        f.readline()
+    candidate = f.tell()
+    while candidate < end:
+        if _is_record_start(f, candidate, width):
+            return candidate
+        f.seek(candidate)
+        f.readline()
+        candidate = f.tell()
+    return end
+
+
+def partition_source(source, parts):
+    """
+    Split a CSV into at most `parts` contiguous row ranges of similar byte size.
+    Returns (fieldnames, [(start, end), ...]) with byte offsets that always fall
+    on record boundaries, so quoted multi-line cells are never cut in half.
+    The file is not scanned: each split point seeks to its byte offset and
+    resyncs on the next record start (see _next_record_start), so the cost
+    does not grow with the number of rows.
+    """
+    size = os.path.getsize(source)
+    with open(source, "rb") as f:
+        reader = csv.reader(_tracked_lines(f))
+        fieldnames = next(reader)
+        start = f.consumed
+        step = max(1, (size - start) // max(1, parts))
+
+        ranges = []
+        previous = start
+        for k in range(1, parts):
+            boundary = _next_record_start(f, start + k * step, len(fieldnames), size)
+            if boundary > previous:
+                ranges.append((previous, boundary))
+                previous = boundary
+        if previous < size:
+            ranges.append((previous, size))
+
+    return fieldnames, ranges
+
+
+def _map_partition(task):
+    mapping_path, source, fieldnames, start, end, part_path, dedupe_window = task
+    triples_maps = maps_by_source(compile_mapping(mapping_path))[source]
+    with open(source, "rb") as f, open(part_path, "w", encoding="utf8") as out:
+        f.seek(start)
+        rows = csv.DictReader(_tracked_lines(f, end), fieldnames=fieldnames)
+        return map_rows(triples_maps, rows, out, dedupe_window)
+
+
+def parallel_mapping(mapping_path, output_path, workers=None, dedupe_window=DEDUPE_WINDOW):
+    """
+    Execute the RML mapping on a process pool.
+    Each logical source is partitioned into row ranges, every range is mapped
+    by a worker into its own part file, and the parts are concatenated in
+    partition order. Subject IRIs come only from the row templates (there are
+    no blank nodes), so the result does not depend on which worker mapped a row
+    and the output is identical from run to run.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    tasks = []
+    for source in maps_by_source(compile_mapping(mapping_path)):
+        fieldnames, ranges = partition_source(source, workers)
+        for start, end in ranges:
+            part_path = f"{output_path}.part{len(tasks)}"
+            tasks.append((mapping_path, source, fieldnames, start, end, part_path, dedupe_window))
+
+    logging.info("Mapping %d partitions on %d workers", len(tasks), workers)
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(tasks)))) as pool:
+        count = sum(pool.map(_map_partition, tasks))
+
+    with open(output_path, "wb") as out:
+        for task in tasks:
+            part_path = task[5]
+            with open(part_path, "rb") as part:
+                shutil.copyfileobj(part, out)
+            os.remove(part_path)
+
+    logging.info("Wrote %d triples to %s", count, output_path)
+    return count
+
+
+def prepend_ontology(ontology_path, kg_path, merged_path):
+    """
+    Write the ontology as N-Triples followed by a byte copy of the KG at
+    `kg_path` to `merged_path`. N-Triples is line based, so this is a merge
+    without a second in-memory graph; only the (small) ontology is parsed.
+    """
+    og = Graph()
+    og.parse(ontology_path)
+
+    with open(merged_path, "wb") as out_file:
+        out_file.write(og.serialize(format="nt", encoding="utf-8"))
+        with open(kg_path, "rb") as kg_file:
+            shutil.copyfileobj(kg_file, out_file)
+    return merged_path
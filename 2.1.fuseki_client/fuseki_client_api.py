@@ -3,17 +3,109 @@
     GoSki Fuseki Client API
     Interacts with a Fuseki SPARQL endpoint to upload RDF and query ski class data.
 """
+import asyncio
+import base64
+import fcntl
+import hashlib
 import json
-from fastapi import FastAPI, Query  # type: ignore
-from SPARQLWrapper import SPARQLWrapper, JSON, TURTLE  # type: ignore
+import re
+from contextlib import asynccontextmanager
+from typing import Dict, List, Literal, Optional, Union
+from fastapi import BackgroundTasks, FastAPI, Query, Request  # type: ignore
+from pydantic import BaseModel, Field
+from fastapi.responses import JSONResponse, Response, StreamingResponse  # type: ignore
 import os
 import time
+import uuid
 import requests
+from requests.adapters import HTTPAdapter
 
-app = FastAPI()
+from sparql_executor import SparqlExecutor
+from result_cache import ResultCache
+from query_registry import QueryRegistry
+from materialized_views import MaterializedViews
+from result_stream import arrow_batches, ndjson_lines, persist_ndjson
+from result_tables import bindings_to_table, table_to_bytes, write_parquet
 
 FUSEKI_ENDPOINT = "http://fuseki:3030/dataset/sparql"
 FUSEKI_HEALTH = "http://fuseki:3030/dataset"
+FUSEKI_DATA = "http://fuseki:3030/dataset/data"
+
+# KG loaded on startup, and where the hash of the loaded file is recorded
+KG_FILE = "/app/files/output/goski-kg_merged.n3"
+META_GRAPH = "urn:goski:meta"
+DATASET_NODE = "urn:goski:dataset"
+CONTENT_HASH = "http://example.org/ski#contentHash"
+# Serializes the startup load between uvicorn workers of one container
+UPLOAD_LOCK = os.getenv("UPLOAD_LOCK", "/tmp/goski-upload.lock")
+
+# Query execution settings
+SPARQL_MAX_CONCURRENCY = int(os.getenv("SPARQL_MAX_CONCURRENCY", 16))
+SPARQL_TIMEOUT = float(os.getenv("SPARQL_TIMEOUT", 30))
+
+# Shared keep-alive connection pool to Fuseki for all queries
+sparql = SparqlExecutor(FUSEKI_ENDPOINT, SPARQL_MAX_CONCURRENCY, SPARQL_TIMEOUT)
+
+# Named query results, invalidated whenever the KG is reloaded
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", 128))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", 300))
+cache = ResultCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL)
+
+# Named queries are parsed once and hot-reloaded when the folder changes
+QUERY_DIR = "/app/files/sparql_queries"
+QUERY_RELOAD_INTERVAL = float(os.getenv("QUERY_RELOAD_INTERVAL", 2))
+registry = QueryRegistry(QUERY_DIR, QUERY_RELOAD_INTERVAL)
+
+# Aggregate dashboard queries computed once per KG load and served from a local table
+MATERIALIZED_VIEWS = os.getenv(
+    "MATERIALIZED_VIEWS",
+    "courses_per_type,courses_per_type_with_startTime,courses_per_type_in_range,"
+    "revenue_per_class_type,revenue_per_class_type_with_startTime,revenue_per_class_type_in_range,"
+    "total_paid_by_user,revenue_per_day,revenue_per_day_by_date,"
+    "daily_appointment_count,daily_appointment_count_by_date,available_months_by_date,"
+    "appointments_by_weekday_hour",
+)
+SUMMARY_DIR = "/app/files/outputs/summaries"
+views = MaterializedViews(registry, [name for name in MATERIALIZED_VIEWS.split(",") if name], SUMMARY_DIR)
+
+# Progress of the background startup load, reported by /api/ready.
+# "uploaded" is False when Fuseki already held the KG (e.g. a persistent TDB2 store built by the loader).
+# "dataset" is the content hash of the loaded KG file; /api/ready adds the process
+# "instance" token and the cache version to it.
+startup = {"ready": False, "status": "starting", "error": None, "uploaded": None, "dataset": None, "instance": None}
+
+@asynccontextmanager
+async def lifespan(app):
+    # New on every start, so a version handed out before a restart is never reused
+    startup["instance"] = uuid.uuid4().hex[:12]
+    registry.refresh()
+    print(f"✅ Loaded {len(registry.queries)} named queries from {QUERY_DIR}")
+    watcher = asyncio.create_task(registry.watch())
+    await sparql.start()
+    # Load the KG in the background so the API (and health checks) answer at once
+    loader = asyncio.create_task(initialize_dataset())
+    yield
+    loader.cancel()
+    watcher.cancel()
+    await sparql.close()
+
+app = FastAPI(lifespan=lifespan)
+
+# Bulk upload settings
+UPLOAD_BATCH_SIZE = int(os.getenv("UPLOAD_BATCH_SIZE", 50000))
+UPLOAD_MAX_RETRIES = int(os.getenv("UPLOAD_MAX_RETRIES", 5))
+UPLOAD_BACKOFF = float(os.getenv("UPLOAD_BACKOFF", 1.0))
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", 4))
+
+# Blank nodes of an upload are sent as IRIs under this prefix (see _ntriples_batches)
+SKOLEM_PREFIX = "urn:goski:genid:"
+_BLANK_LABEL = rb"_:([A-Za-z0-9_](?:[A-Za-z0-9_.-]*[A-Za-z0-9_-])?)"
+_BLANK_SUBJECT = re.compile(rb"^\s*" + _BLANK_LABEL)
+_BLANK_OBJECT = re.compile(rb"^(\s*\S+\s+<[^>]*>\s+)" + _BLANK_LABEL)
+
+# Pooled keep-alive connections to Fuseki, shared by all uploads
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=UPLOAD_WORKERS, pool_maxsize=UPLOAD_WORKERS))
 
 def wait_for_fuseki(timeout=100):
     start = time.time()
@@ -30,37 +122,206 @@ def wait_for_fuseki(timeout=100):
         print("⏳ Waiting for Fuseki...")
         time.sleep(3)
 
-def upload_rdf_file(file_path="/app/data/goski-kg_merged.ttl"):
-    fuseki_data_endpoint = "http://fuseki:3030/dataset/data"
+def file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
+def select_json(query):
+    """
+    Blocking SELECT for the startup and refresh threads; returns SPARQL JSON results.
+    """
+    response = session.post(FUSEKI_ENDPOINT, data={"query": query},
+                            headers={"Accept": "application/sparql-results+json"})
+    response.raise_for_status()
+    return response.json()
+
+def loaded_content_hash():
+    """
+    Hash of the KG file last loaded into Fuseki, or None if nothing was recorded.
+    """
+    query = f"SELECT ?hash WHERE {{ GRAPH <{META_GRAPH}> {{ <{DATASET_NODE}> <{CONTENT_HASH}> ?hash }} }}"
+    bindings = select_json(query)["results"]["bindings"]
+    return bindings[0]["hash"]["value"] if bindings else None
+
+def refresh_views(dataset, names=None):
+    """
+    Recompute the materialized views for the KG with content hash `dataset`.
+    """
+    start = time.time()
+    counts = views.refresh(select_json, dataset, names)
+    cache.bump_version()
+    print(f"✅ Materialized {len(counts)} views in {time.time() - start:.1f}s")
+    return counts
+
+def record_content_hash(content_hash):
+    """
+    Replace the meta graph with the hash of the file just loaded.
+    The meta graph is a named graph, so it never shows up in the queries.
+    """
+    triple = f'<{DATASET_NODE}> <{CONTENT_HASH}> "{content_hash}" .\n'
+    response = session.put(FUSEKI_DATA, params={"graph": META_GRAPH}, data=triple.encode(),
+                           headers={"Content-Type": "application/n-triples"})
+    response.raise_for_status()
+
+def load_dataset(file_path=KG_FILE):
+    """
+    Upload the KG unless Fuseki already holds a file with the same content hash.
+    A different recorded hash means a stale KG, whose default graph is dropped
+    first. The file lock makes other workers wait and then skip the upload.
+    Returns True when the file was uploaded.
+    """
     if not os.path.isfile(file_path):
         print(f"⚠️ RDF file not found: {file_path}")
-        return
+        return False
+
+    with open(UPLOAD_LOCK, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        content_hash = file_sha256(file_path)
+        current = loaded_content_hash()
+        if current == content_hash:
+            print(f"✅ Fuseki already holds '{file_path}' ({content_hash[:12]}), skipping upload.")
+            # Summaries saved for this KG are reused; only missing or outdated ones are recomputed
+            missing = views.load(content_hash)
+            if missing:
+                refresh_views(content_hash, missing)
+            startup["dataset"] = content_hash
+            return False
+        if current is not None:
+            # Forget the old hash first: a failed upload must not look like a loaded KG
+            session.delete(FUSEKI_DATA, params={"graph": META_GRAPH}).raise_for_status()
+            session.delete(FUSEKI_DATA, params={"default": ""}).raise_for_status()
+        # Raises on a failed upload, so the hash is only recorded for a loaded KG
+        upload_rdf_file(file_path)
+        record_content_hash(content_hash)
+        refresh_views(content_hash)
+        startup["dataset"] = content_hash
+        return True
+
+async def initialize_dataset():
+    try:
+        startup["status"] = "waiting_for_fuseki"
+        await asyncio.to_thread(wait_for_fuseki)
+        startup["status"] = "loading"
+        uploaded = await asyncio.to_thread(load_dataset)
+        startup.update(ready=True, status="ready", uploaded=uploaded)
+    except Exception as e:
+        startup.update(status="failed", error=str(e))
+        print(f"❌ Startup load failed: {e}")
+
+def upload_rdf_file(file_path="/app/files/output/goski-kg_merged.n3"):
+    """
+    Upload an RDF file into the default graph. Raises when the file is
+    missing or Fuseki rejects it, so callers never treat it as loaded.
+    """
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"RDF file not found: {file_path}")
+
+    # N-Triples (what the mapping writes) goes through the batched bulk loader
+    if not file_path.endswith(".ttl"):
+        total = bulk_upload_ntriples(file_path)
+        views.clear()
+        cache.bump_version()
+        return total
 
     with open(file_path, "rb") as f:
         headers = {"Content-Type": "text/turtle"}
-        response = requests.post(fuseki_data_endpoint, data=f, headers=headers)
+        response = session.post(FUSEKI_DATA, data=f, headers=headers)
 
-    if response.status_code == 200:
-        print(f"✅ RDF file '{file_path}' uploaded to Fuseki.")
-    else:
+    if not response.ok:
         print(f"❌ RDF upload failed: {response.status_code} {response.text}")
+    response.raise_for_status()
+    print(f"✅ RDF file '{file_path}' uploaded to Fuseki.")
+    views.clear()
+    cache.bump_version()
 
-def run_sparql(query: str, query_type: str = "SELECT"):
-    sparql = SPARQLWrapper(FUSEKI_ENDPOINT)
-    sparql.setQuery(query)
+def _skolemize(line, prefix):
+    """
+    Replace the blank node subject and object of an N-Triples line by IRIs
+    under `prefix`. Labels inside literals are left alone.
+    """
+    line = _BLANK_SUBJECT.sub(lambda m: b"<" + prefix + m.group(1) + b">", line, count=1)
+    return _BLANK_OBJECT.sub(lambda m: m.group(1) + b"<" + prefix + m.group(2) + b">", line, count=1)
 
-    if query_type.upper() in ["SELECT", "ASK"]:
-        sparql.setReturnFormat(JSON)
-    elif query_type.upper() in ["CONSTRUCT", "DESCRIBE"]:
-        sparql.setReturnFormat(TURTLE)
-    else:
-        raise ValueError("Unsupported query type")
+def _ntriples_batches(file_path, batch_size):
+    """
+    Read an N-Triples file lazily and yield (payload, triple_count) batches.
+    Blank node labels are only scoped to a single request, so blank nodes
+    are skolemized: each label becomes an IRI unique to this upload, which
+    keeps the same node across batches without holding its lines back.
+    """
+    prefix = f"{SKOLEM_PREFIX}{uuid.uuid4().hex}:".encode()
+    batch = []
+    with open(file_path, "rb") as f:
+        for line in f:
+            if not line.strip() or line.startswith(b"#"):
+                continue
+            if b"_:" in line:
+                line = _skolemize(line, prefix)
+            batch.append(line)
+            if len(batch) >= batch_size:
+                yield b"".join(batch), len(batch)
+                batch = []
+    if batch:
+        yield b"".join(batch), len(batch)
 
-    return sparql.query().convert()
+def _post_batch(payload, graph=None):
+    """
+    POST one N-Triples batch, retrying with exponential backoff on
+    connection errors and 5xx answers. 4xx answers are not retried.
+    """
+    params = {"graph": graph} if graph else {"default": ""}
+    headers = {"Content-Type": "application/n-triples"}
+    for attempt in range(UPLOAD_MAX_RETRIES + 1):
+        try:
+            response = session.post(FUSEKI_DATA, params=params, data=payload, headers=headers)
+            if response.status_code < 500:
+                response.raise_for_status()
+                return
+            error = f"{response.status_code} {response.text[:200]}"
+        except requests.HTTPError:
+            raise
+        except requests.RequestException as e:
+            error = str(e)
+        if attempt == UPLOAD_MAX_RETRIES:
+            raise RuntimeError(f"Batch upload failed after {attempt + 1} attempts: {error}")
+        delay = UPLOAD_BACKOFF * 2 ** attempt
+        print(f"⚠️ Batch upload failed ({error}), retrying in {delay:.1f}s")
+        time.sleep(delay)
+
+def bulk_upload_ntriples(file_path, graph=None, batch_size=UPLOAD_BATCH_SIZE):
+    """
+    Stream an N-Triples file to Fuseki in batches of `batch_size` triples,
+    so neither side has to hold the whole file at once.
+    Loads into the default graph unless a named `graph` IRI is given.
+    Returns the number of triples sent.
+    """
+    start = time.time()
+    total = 0
+    for payload, count in _ntriples_batches(file_path, batch_size):
+        _post_batch(payload, graph)
+        total += count
+    elapsed = max(time.time() - start, 1e-9)
+    target = graph or "default graph"
+    print(f"✅ Uploaded {total} triples from '{file_path}' to {target} in {elapsed:.1f}s ({total / elapsed:,.0f} triples/s).")
+    return total
+
+async def run_sparql(query: str, query_type: str = "SELECT", request: Request = None):
+    """
+    Run a query through the shared executor. When the FastAPI `request` is
+    given, the query is cancelled as soon as the caller disconnects.
+    """
+    return await sparql.query(query, query_type, request=request)
+
+def save_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
 
 @app.get("/api/test-sparql")
-def test_sparql():
+async def test_sparql(request: Request):
     """
     Execute a test query: List 10 clients with their emails.
     """
@@ -77,44 +338,258 @@ def test_sparql():
         LIMIT 10
     """
     try:
-        results = run_sparql(query, "SELECT")
+        results = await run_sparql(query, "SELECT", request)
         output_path = "/app/files/outputs/test_sparql_result.json"
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, "w") as f:
-            json.dump(results, f, indent=2)
+        await asyncio.to_thread(save_json, output_path, results)
         return {"results": results}
+    except asyncio.TimeoutError:
+        return {"error": f"Query timed out after {SPARQL_TIMEOUT}s"}
     except Exception as e:
         return {"error": str(e)}
 
+def query_bindings(named_query, request):
+    """
+    Resolve the parameters a named query declares from the request query
+    string. Returns (bindings, explicit) where `explicit` tells whether the
+    caller set any of them; raises ValueError for invalid values.
+    """
+    explicit = any(param in request.query_params for param in named_query.params)
+    return named_query.resolve_params(request.query_params), explicit
+
+async def stream_named_query(named_query, limit, result_format, persist, bindings=None):
+    if named_query.query_type != "SELECT":
+        return {"error": "Streaming formats are only available for SELECT queries"}
+
+    rows = sparql.stream_select(named_query.with_limit(limit, bindings))
+    try:
+        # The first item is the variable list; errors from Fuseki surface here
+        variables = await rows.__anext__()
+    except BaseException:
+        await rows.aclose()
+        raise
+
+    bindings = rows
+    if persist:
+        bindings = persist_ndjson(rows, f"/app/files/outputs/{named_query.name}.ndjson")
+
+    headers = {"X-SPARQL-Variables": ",".join(variables)}
+    if result_format == "arrow":
+        return StreamingResponse(arrow_batches(variables, bindings),
+                                 media_type="application/vnd.apache.arrow.stream", headers=headers)
+    return StreamingResponse(ndjson_lines(bindings), media_type="application/x-ndjson", headers=headers)
+
 @app.get("/api/query/{query_name}")
-def run_named_query(query_name: str, limit: int = Query(None)):
-    query_path = f"/app/files/sparql_queries/{query_name}.rq"
+async def run_named_query(query_name: str, request: Request, background: BackgroundTasks,
+                          limit: int = Query(None, gt=0),
+                          result_format: Literal["json", "ndjson", "arrow"] = Query("json", alias="format"),
+                          persist: bool = Query(True)):
+    """
+    Execute a named query. format=json returns the buffered SPARQL JSON result;
+    format=ndjson and format=arrow stream SELECT bindings as they arrive.
+    Parameters declared in the query file (e.g. ?from=2025-02-01&to=2025-03-01)
+    are bound as typed literals.
+    With persist=true the result is also written to the outputs folder,
+    after the response (json) or while streaming (ndjson/arrow, as .ndjson).
+    Filtered results (explicit parameters) are never persisted.
+    """
     output_path = f"/app/files/outputs/{query_name}.json"
 
-    if not os.path.isfile(query_path):
-        return {"error": f"Query file not found: {query_path}"}
+    named_query = registry.get(query_name)
+    if named_query is None:
+        return {"error": f"Query file not found: {QUERY_DIR}/{query_name}.rq"}
 
     try:
-        with open(query_path, "r") as f:
-            query = f.read()
+        bindings, explicit = query_bindings(named_query, request)
+    except ValueError as e:
+        return {"error": str(e)}
+    persist = persist and not explicit
 
-        if limit:
-            query += f"\nLIMIT {limit}"
+    if result_format != "json":
+        try:
+            return await stream_named_query(named_query, limit, result_format, persist, bindings)
+        except asyncio.TimeoutError:
+            return {"error": f"Query timed out after {SPARQL_TIMEOUT}s"}
+        except Exception as e:
+            return {"error": str(e)}
 
-        results = run_sparql(query, "SELECT")
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, "w") as f:
-            json.dump(results, f, indent=2)
+    # The file mtime is part of the key, so an edited query is never served stale
+    cache_key = (query_name, named_query.mtime, limit, persist, tuple(sorted(bindings.items())))
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+    version = cache.version
 
-        return {
+    try:
+        # Unfiltered reads of aggregate queries come from the materialized views
+        results = None if explicit else views.get(named_query, limit)
+        if results is None:
+            query = named_query.with_limit(limit, bindings)
+            results = await run_sparql(query, named_query.query_type, request)
+        if persist:
+            background.add_task(save_json, output_path, results)
+            if named_query.query_type == "SELECT":
+                background.add_task(write_parquet, results, f"/app/files/outputs/{query_name}.parquet")
+
+        response = {
             "message": f"Query '{query_name}' executed successfully.",
             "limit": limit,
-            "saved_to": output_path,
+            "params": {param: request.query_params[param] for param in named_query.params if param in request.query_params},
+            "saved_to": output_path if persist else None,
             "results": results
         }
+        cache.set(cache_key, response, version)
+        return response
+    except asyncio.TimeoutError:
+        return {"error": f"Query timed out after {SPARQL_TIMEOUT}s"}
+    except Exception as e:
+        return {"error": str(e)}
+
+TABLE_MEDIA_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+@app.get("/api/table/{query_name}")
+async def get_query_table(query_name: str, request: Request, limit: int = Query(None, gt=0),
+                          table_format: Literal["parquet", "arrow"] = Query("parquet", alias="format")):
+    """
+    Return a named SELECT query result as a typed Parquet file or Arrow IPC file:
+    numbers as float64, start times and days as timestamps, labels as categorical.
+    Accepts the same query parameters as /api/query.
+    """
+    named_query = registry.get(query_name)
+    if named_query is None or named_query.query_type != "SELECT":
+        return JSONResponse({"error": f"SELECT query not found: {query_name}"}, status_code=404)
+
+    try:
+        bindings, explicit = query_bindings(named_query, request)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    cache_key = ("table", query_name, named_query.mtime, limit, table_format, tuple(sorted(bindings.items())))
+    body = cache.get(cache_key)
+    if body is None:
+        version = cache.version
+        try:
+            results = None if explicit else views.get(named_query, limit)
+            if results is None:
+                results = await run_sparql(named_query.with_limit(limit, bindings), "SELECT", request)
+        except asyncio.TimeoutError:
+            return JSONResponse({"error": f"Query timed out after {SPARQL_TIMEOUT}s"}, status_code=504)
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, status_code=502)
+        body = await asyncio.to_thread(lambda: table_to_bytes(bindings_to_table(results), table_format))
+        cache.set(cache_key, body, version)
+
+    return Response(body, media_type=TABLE_MEDIA_TYPES[table_format])
+
+class BatchQuery(BaseModel):
+    name: str
+    # Key of this result in the response, defaults to the query name
+    key: Optional[str] = None
+    limit: Optional[int] = Field(None, gt=0)
+    params: Dict[str, Union[str, int, float]] = {}
+
+class BatchRequest(BaseModel):
+    queries: List[BatchQuery]
+    format: Literal["json", "parquet"] = "json"
+
+async def fetch_results(named_query, limit=None, bindings=None, explicit=False, request=None):
+    """
+    SPARQL JSON results of a named query, from the result cache, then the
+    materialized views, then Fuseki.
+    """
+    cache_key = ("results", named_query.name, named_query.mtime, limit, tuple(sorted((bindings or {}).items())))
+    results = cache.get(cache_key)
+    if results is None:
+        version = cache.version
+        results = None if explicit else views.get(named_query, limit)
+        if results is None:
+            results = await run_sparql(named_query.with_limit(limit, bindings), named_query.query_type, request)
+        cache.set(cache_key, results, version)
+    return results
+
+async def run_batch_entry(entry, table_format, request):
+    named_query = registry.get(entry.name)
+    if named_query is None:
+        return {"error": f"Query file not found: {QUERY_DIR}/{entry.name}.rq"}
+    try:
+        values = {param: str(value) for param, value in entry.params.items()}
+        bindings = named_query.resolve_params(values)
+        explicit = any(param in values for param in named_query.params)
+        results = await fetch_results(named_query, entry.limit, bindings, explicit, request)
+        if table_format == "parquet":
+            body = await asyncio.to_thread(lambda: table_to_bytes(bindings_to_table(results)))
+            return {"parquet": base64.b64encode(body).decode()}
+        return {"results": results}
+    except asyncio.TimeoutError:
+        return {"error": f"Query timed out after {SPARQL_TIMEOUT}s"}
     except Exception as e:
         return {"error": str(e)}
 
-# === On container startup ===
-wait_for_fuseki()
-upload_rdf_file("/app/files/output/goski-kg_merged.ttl")
+@app.post("/api/batch")
+async def run_batch(batch: BatchRequest, request: Request):
+    """
+    Run several named queries concurrently (bounded by SPARQL_MAX_CONCURRENCY)
+    and return every result in one response, keyed by `key` or query name.
+    A failing query only sets an "error" for its own entry.
+    format=parquet returns each result as a base64 encoded typed Parquet file.
+    """
+    entries = await asyncio.gather(*(run_batch_entry(q, batch.format, request) for q in batch.queries))
+    return {"results": {q.key or q.name: entry for q, entry in zip(batch.queries, entries)}}
+
+@app.get("/api/queries")
+def list_queries():
+    """
+    Named queries currently loaded, plus the files that failed validation.
+    """
+    return {
+        "queries": [q.describe() for q in sorted(registry.queries.values(), key=lambda q: q.name)],
+        "errors": {name: error for name, (_, error) in registry.errors.items()},
+    }
+
+@app.get("/api/health")
+def health():
+    """
+    Liveness: the API process is up.
+    """
+    return {"status": "ok"}
+
+@app.get("/api/ready")
+def ready():
+    """
+    Readiness: Fuseki is reachable and the KG is loaded.
+    "version" changes whenever the loaded KG or the materialized views do
+    (e.g. a SPARQL Update patch followed by /api/views/refresh), unlike
+    "dataset", the hash of the KG file.
+    """
+    version = f"{startup['dataset']}:{startup['instance']}:{cache.version}" if startup["dataset"] else None
+    return JSONResponse(dict(startup, version=version), status_code=200 if startup["ready"] else 503)
+
+@app.get("/api/views")
+def list_views():
+    """
+    Materialized views currently served, with row counts and refresh times,
+    and the views whose last refresh failed (their queries run live).
+    """
+    return {"configured": views.names, "views": views.stats(), "errors": dict(views.errors)}
+
+@app.post("/api/views/refresh")
+async def refresh_materialized_views():
+    """
+    Recompute every materialized view, e.g. after a SPARQL Update patch.
+    """
+    if not startup["ready"]:
+        return JSONResponse({"error": f"KG not loaded yet ({startup['status']})"}, status_code=503)
+    try:
+        dataset = await asyncio.to_thread(loaded_content_hash)
+        return {"refreshed": await asyncio.to_thread(refresh_views, dataset)}
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=502)
+
+@app.get("/api/cache/stats")
+def cache_stats():
+    """
+    Hit/miss counters and size of the named query result cache.
+    """
+    return cache.stats()
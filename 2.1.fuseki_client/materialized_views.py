@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+    Materialized views
+    Runs the aggregate dashboard queries once per KG load and keeps their
+    results as a small local table (in memory, mirrored as JSON files), so
+    dashboard reads no longer re-scan and re-group every appointment.
+"""
+import json
+import os
+import threading
+import time
+
+
+class MaterializedViews:
+    def __init__(self, registry, names, directory):
+        self.registry = registry
+        self.names = list(names)
+        self.directory = directory
+        self.views = {}
+        # View name -> error of its last failed refresh
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _save(self, name, view):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self._path(name) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(view, f)
+        os.replace(tmp_path, self._path(name))
+
+    def clear(self):
+        with self._lock:
+            self.views.clear()
+
+    def _drop(self, name):
+        with self._lock:
+            self.views.pop(name, None)
+        try:
+            os.remove(self._path(name))
+        except OSError:
+            pass
+
+    def load(self, dataset):
+        """
+        Load the summaries saved for `dataset` (the KG content hash), e.g.
+        after a restart where Fuseki still holds the same KG.
+        Returns the view names that have to be recomputed.
+        """
+        missing = []
+        for name in self.names:
+            try:
+                with open(self._path(name), "r") as f:
+                    view = json.load(f)
+            except (OSError, ValueError):
+                view = None
+            named_query = self.registry.get(name)
+            if view is None or named_query is None or view["dataset"] != dataset or view["mtime"] != named_query.mtime:
+                missing.append(name)
+                continue
+            with self._lock:
+                self.views[name] = view
+        return missing
+
+    def refresh(self, run_select, dataset, names=None):
+        """
+        Recompute the views (all of them by default) with `run_select`, a
+        function that runs a SELECT query and returns SPARQL JSON results.
+        Parameterized queries are materialized with their default values.
+        A view that fails is logged and dropped, so its query runs live
+        instead of serving an outdated result. Returns view name -> row count.
+        """
+        counts = {}
+        for name in self.names if names is None else names:
+            named_query = self.registry.get(name)
+            if named_query is None or named_query.query_type != "SELECT":
+                print(f"⚠️ Materialized view '{name}' skipped: no SELECT query with that name")
+                continue
+            start = time.time()
+            try:
+                results = run_select(named_query.with_limit(None, named_query.resolve_params({})))
+            except Exception as e:
+                self._drop(name)
+                with self._lock:
+                    self.errors[name] = str(e)
+                print(f"⚠️ Materialized view '{name}' failed, served live: {e}")
+                continue
+            view = {
+                "dataset": dataset,
+                "mtime": named_query.mtime,
+                "refreshed_at": time.time(),
+                "elapsed": time.time() - start,
+                "results": results,
+            }
+            try:
+                self._save(name, view)
+            except OSError as e:
+                print(f"⚠️ Materialized view '{name}' not saved, kept in memory: {e}")
+            with self._lock:
+                self.views[name] = view
+                self.errors.pop(name, None)
+            counts[name] = len(results.get("results", {}).get("bindings", []))
+        return counts
+
+    def get(self, named_query, limit=None):
+        """
+        Return the materialized result of `named_query`, cut to `limit` rows,
+        or None when there is no up-to-date view for it (e.g. the .rq file
+        was edited since the last refresh).
+        """
+        with self._lock:
+            view = self.views.get(named_query.name)
+        if view is None or view["mtime"] != named_query.mtime:
+            return None
+        results = view["results"]
+        if limit:
+            results = dict(results, results={"bindings": results["results"]["bindings"][:limit]})
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {
+                    "rows": len(view["results"].get("results", {}).get("bindings", [])),
+                    "refreshed_at": view["refreshed_at"],
+                    "elapsed": round(view["elapsed"], 3),
+                }
+                for name, view in self.views.items()
+            }
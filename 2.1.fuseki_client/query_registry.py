@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+    Named query registry
+    Loads and validates every .rq file of the queries folder once, keeps the
+    parsed queries in memory and hot-reloads the folder when files change.
+"""
+import asyncio
+import os
+import re
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from rdflib.plugins.sparql.parser import parseQuery
+
+# IRIs and string literals may contain "#", so they are matched first and kept
+_COMMENT = re.compile(r'(<[^<>"{}|^`\\\s]*>|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\')|#[^\n]*')
+_PROLOGUE = re.compile(r"^\s*(?:(?:PREFIX\s+[^\s:]*:\s*<[^>]*>|BASE\s*<[^>]*>)\s*)*", re.IGNORECASE)
+_QUERY_TYPE = re.compile(r"(SELECT|CONSTRUCT|ASK|DESCRIBE)\b", re.IGNORECASE)
+_TRAILING_LIMIT = re.compile(r"\bLIMIT\s+(\d+)(\s+OFFSET\s+\d+)?\s*$", re.IGNORECASE)
+_TRAILING_OFFSET = re.compile(r"\bOFFSET\s+\d+(\s+LIMIT\s+(\d+))?\s*$", re.IGNORECASE)
+_ORDER_BY = re.compile(r"\bORDER\s+BY\b", re.IGNORECASE)
+# "# @param from xsd:dateTime "1900-01-01T00:00:00"" declares ?from, with an optional default
+_PARAM = re.compile(r'^\s*#\s*@param\s+[?$]?(\w+)\s+xsd:(\w+)(?:\s+"([^"]*)")?\s*$', re.MULTILINE)
+# Variables outside IRIs and string literals
+_VARIABLE = re.compile(r'(<[^<>"{}|^`\\\s]*>|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\')|[?$](\w+)')
+
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+
+def strip_comments(text):
+    return _COMMENT.sub(lambda m: m.group(1) or "", text)
+
+
+def _escape_string(value):
+    for char, escaped in (("\\", "\\\\"), ('"', '\\"'), ("\n", "\\n"), ("\r", "\\r"), ("\t", "\\t")):
+        value = value.replace(char, escaped)
+    return value
+
+
+def format_literal(value, datatype):
+    """
+    Validate a raw parameter value and return it as a SPARQL typed literal.
+    Raises ValueError if the value does not fit the datatype.
+    """
+    value = value.strip() if datatype != "string" else value
+    if datatype == "dateTime":
+        # A plain date means midnight, e.g. from=2025-02-01
+        lexical = datetime.fromisoformat(value).isoformat(timespec="seconds")
+    elif datatype == "date":
+        lexical = date.fromisoformat(value).isoformat()
+    elif datatype == "integer":
+        lexical = str(int(value))
+    elif datatype == "decimal":
+        try:
+            number = Decimal(value)
+        except InvalidOperation:
+            raise ValueError(f"invalid decimal: {value!r}")
+        if not number.is_finite():
+            raise ValueError(f"invalid decimal: {value!r}")
+        lexical = str(number)
+    elif datatype == "string":
+        lexical = value
+    else:
+        raise ValueError(f"unsupported parameter type xsd:{datatype}")
+    return f'"{_escape_string(lexical)}"^^<{XSD}{datatype}>'
+
+
+class NamedQuery:
+    def __init__(self, name, path, text, mtime):
+        self.name = name
+        self.path = path
+        self.text = text
+        self.mtime = mtime
+
+        # Raises a ParseException for invalid SPARQL
+        parseQuery(text)
+
+        # Parameter name -> (xsd datatype, default value, or None when required)
+        self.params = {}
+        for match in _PARAM.finditer(text):
+            param, datatype, default = match.groups()
+            if default is not None:
+                # Raises a ValueError for a default that does not fit its type
+                format_literal(default, datatype)
+            self.params[param] = (datatype, default)
+
+        self.body = strip_comments(text).rstrip()
+        match = _QUERY_TYPE.match(self.body[_PROLOGUE.match(self.body).end():])
+        self.query_type = match.group(1).upper() if match else "SELECT"
+
+        # Solution modifiers of the outer query come after its last "}"
+        modifiers = self.body[self.body.rfind("}") + 1:]
+        self.has_order_by = bool(_ORDER_BY.search(modifiers))
+        self.limit = None
+        match = _TRAILING_LIMIT.search(modifiers)
+        if match:
+            self.limit = int(match.group(1))
+        else:
+            match = _TRAILING_OFFSET.search(modifiers)
+            if match and match.group(2):
+                self.limit = int(match.group(2))
+
+    def resolve_params(self, values):
+        """
+        Validate the declared parameters found in `values` (e.g. the request
+        query string) and fill in defaults. Returns parameter name -> SPARQL
+        literal; raises ValueError for a missing or malformed value.
+        """
+        bindings = {}
+        for param, (datatype, default) in self.params.items():
+            value = values.get(param, default)
+            if value is None:
+                raise ValueError(f"missing required parameter '{param}' (xsd:{datatype})")
+            try:
+                bindings[param] = format_literal(value, datatype)
+            except ValueError as e:
+                raise ValueError(f"invalid value for parameter '{param}' (xsd:{datatype}): {e}")
+        return bindings
+
+    def bind(self, bindings=None):
+        """
+        Return the query text with each parameter variable replaced by its
+        literal from resolve_params. Values only ever enter the query as
+        escaped typed literals, never as SPARQL syntax.
+        """
+        if not bindings:
+            return self.body
+
+        def replace(match):
+            if match.group(1):
+                return match.group(1)
+            return bindings.get(match.group(2), match.group(0))
+        return _VARIABLE.sub(replace, self.body)
+
+    def with_limit(self, limit=None, bindings=None):
+        """
+        Return the query text with its parameters bound and `limit` applied.
+        A query that already has a LIMIT keeps the smaller of the two instead
+        of getting a second one.
+        """
+        body = self.bind(bindings)
+        if not limit:
+            return body
+        if self.limit is None:
+            return f"{body}\nLIMIT {int(limit)}"
+        new_limit = min(self.limit, int(limit))
+        head, _, tail = body.rpartition("}")
+        tail = re.sub(r"\bLIMIT\s+\d+", f"LIMIT {new_limit}", tail, flags=re.IGNORECASE)
+        return f"{head}}}{tail}"
+
+    def describe(self):
+        return {
+            "name": self.name,
+            "type": self.query_type,
+            "limit": self.limit,
+            "order_by": self.has_order_by,
+            "params": {
+                param: {"type": f"xsd:{datatype}", "default": default}
+                for param, (datatype, default) in self.params.items()
+            },
+        }
+
+
+class QueryRegistry:
+    def __init__(self, directory, poll_interval=2.0):
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.queries = {}
+        self.errors = {}
+
+    def _scan(self):
+        if not os.path.isdir(self.directory):
+            return {}
+        return {
+            entry.name[:-3]: (entry.path, entry.stat().st_mtime)
+            for entry in os.scandir(self.directory)
+            if entry.is_file() and entry.name.endswith(".rq")
+        }
+
+    def refresh(self):
+        """
+        Load new and modified .rq files and forget deleted ones.
+        Invalid queries are kept out of the registry and listed in `errors`.
+        Returns the names that changed.
+        """
+        files = self._scan()
+        changed = [name for name in self.queries if name not in files]
+        for name in changed:
+            del self.queries[name]
+        for name in list(self.errors):
+            if name not in files:
+                del self.errors[name]
+
+        for name, (path, mtime) in files.items():
+            known = self.queries.get(name)
+            if known is not None and known.mtime == mtime:
+                continue
+            if name in self.errors and self.errors[name][0] == mtime:
+                continue
+            try:
+                with open(path, "r") as f:
+                    self.queries[name] = NamedQuery(name, path, f.read(), mtime)
+                self.errors.pop(name, None)
+                changed.append(name)
+            except Exception as e:
+                self.queries.pop(name, None)
+                self.errors[name] = (mtime, str(e))
+                print(f"⚠️ Invalid query '{name}': {e}")
+        return changed
+
+    def get(self, name):
+        return self.queries.get(name)
+
+    async def watch(self):
+        """
+        Poll the folder for changes until cancelled.
+        """
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            changed = await asyncio.to_thread(self.refresh)
+            if changed:
+                print(f"🔄 Reloaded queries: {', '.join(sorted(changed))}")
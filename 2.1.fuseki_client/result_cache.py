@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+    Query result cache
+    LRU cache with a TTL for named query results. Entries are tied to a
+    dataset version counter, which is bumped whenever the KG is (re)loaded,
+    so a reload invalidates every cached result at once.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    def __init__(self, maxsize=128, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Uploads run in worker threads, queries on the event loop
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the cached value for `key`, or None on a miss.
+        Expired entries and entries from an older dataset version are dropped.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, version, value = entry
+                if version == self.version and expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value, version):
+        """
+        Store `value`, computed from dataset `version` (read before the query
+        ran). A result that raced a reload is from the old KG and is dropped.
+        """
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def bump_version(self):
+        """
+        Mark the dataset as changed and drop every cached result.
+        """
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            return self.version
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "dataset_version": self.version,
+            }
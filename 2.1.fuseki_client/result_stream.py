@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+    Streaming SELECT results
+    Parses SPARQL TSV results line by line into SPARQL JSON bindings and
+    re-encodes them as NDJSON or Arrow IPC stream chunks, so a large result
+    passes through the API without ever being held in memory as a whole.
+"""
+import asyncio
+import io
+import json
+import os
+import re
+import tempfile
+
+import pyarrow as pa
+
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+# Number of rows per Arrow record batch
+ARROW_BATCH_ROWS = 1024
+
+_ESCAPE = re.compile(r"\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)")
+_ESCAPES = {"t": "\t", "n": "\n", "r": "\r", "b": "\b", "f": "\f", '"': '"', "'": "'", "\\": "\\"}
+_LITERAL = re.compile(r'^"(.*)"(?:@([A-Za-z0-9-]+)|\^\^<([^>]*)>)?$', re.DOTALL)
+_INTEGER = re.compile(r"^[+-]?\d+$")
+_DECIMAL = re.compile(r"^[+-]?\d*\.\d+$")
+_DOUBLE = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)[eE][+-]?\d+$")
+
+
+def _unescape(value):
+    def replace(match):
+        code = match.group(1)
+        if code[0] in "uU" and len(code) > 1:
+            return chr(int(code[1:], 16))
+        return _ESCAPES.get(code, code)
+    return _ESCAPE.sub(replace, value)
+
+
+def parse_tsv_term(field):
+    """
+    Convert one SPARQL TSV field to a SPARQL JSON term, or None if unbound.
+    """
+    if not field:
+        return None
+    if field.startswith("<") and field.endswith(">"):
+        return {"type": "uri", "value": field[1:-1]}
+    if field.startswith("_:"):
+        return {"type": "bnode", "value": field[2:]}
+
+    match = _LITERAL.match(field)
+    if match:
+        term = {"type": "literal", "value": _unescape(match.group(1))}
+        if match.group(2):
+            term["xml:lang"] = match.group(2)
+        elif match.group(3):
+            term["datatype"] = match.group(3)
+        return term
+
+    # Numbers and booleans are written in their Turtle short form
+    for pattern, datatype in ((_INTEGER, "integer"), (_DECIMAL, "decimal"), (_DOUBLE, "double")):
+        if pattern.match(field):
+            return {"type": "literal", "value": field, "datatype": XSD + datatype}
+    if field in ("true", "false"):
+        return {"type": "literal", "value": field, "datatype": XSD + "boolean"}
+    return {"type": "literal", "value": field}
+
+
+def parse_tsv_header(line):
+    return [name.strip().lstrip("?$") for name in line.split("\t")]
+
+
+def parse_tsv_row(variables, line):
+    binding = {}
+    for name, field in zip(variables, line.split("\t")):
+        term = parse_tsv_term(field)
+        if term is not None:
+            binding[name] = term
+    return binding
+
+
+async def ndjson_lines(bindings):
+    """
+    Encode bindings as newline-delimited JSON, one SPARQL JSON binding per line.
+    """
+    async for binding in bindings:
+        yield (json.dumps(binding) + "\n").encode()
+
+
+async def persist_ndjson(bindings, path, buffer_size=1 << 16):
+    """
+    Pass bindings through unchanged while writing them to `path` as NDJSON.
+    Writes are buffered and done off the event loop. The file only replaces
+    `path` once the whole result went through.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # A temp file per stream: concurrent streams of one query never share it
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.chmod(tmp_path, 0o644)
+    f = os.fdopen(fd, "w")
+    buffer = []
+    size = 0
+    try:
+        async for binding in bindings:
+            line = json.dumps(binding) + "\n"
+            buffer.append(line)
+            size += len(line)
+            if size >= buffer_size:
+                await asyncio.to_thread(f.write, "".join(buffer))
+                buffer, size = [], 0
+            yield binding
+        await asyncio.to_thread(f.write, "".join(buffer))
+        await asyncio.to_thread(f.close)
+        await asyncio.to_thread(os.replace, tmp_path, path)
+    finally:
+        if not f.closed:
+            f.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+async def arrow_batches(variables, bindings, batch_rows=ARROW_BATCH_ROWS):
+    """
+    Encode bindings as an Arrow IPC stream with one nullable string column per
+    variable (the term values). Yields the schema, then one chunk per batch.
+    """
+    schema = pa.schema([(name, pa.string()) for name in variables])
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+
+    def flush():
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    yield flush()
+    columns = {name: [] for name in variables}
+    rows = 0
+    async for binding in bindings:
+        for name in variables:
+            term = binding.get(name)
+            columns[name].append(term["value"] if term else None)
+        rows += 1
+        if rows == batch_rows:
+            writer.write_batch(pa.record_batch([columns[n] for n in variables], schema=schema))
+            columns = {name: [] for name in variables}
+            rows = 0
+            yield flush()
+    if rows:
+        writer.write_batch(pa.record_batch([columns[n] for n in variables], schema=schema))
+    writer.close()
+    yield flush()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+    Typed columnar query results
+    Converts SPARQL JSON results into typed Arrow tables (numbers as float64,
+    start times and days as timestamps, repetitive labels as dictionary /
+    categorical columns) and writes them as Parquet or Arrow IPC, so the
+    dashboards can load them without building a dict per row or re-parsing
+    dates on every render.
+
+    Usage: python result_tables.py <folder with query JSON outputs>
+"""
+import io
+import json
+import os
+import sys
+import tempfile
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+XSD = "http://www.w3.org/2001/XMLSchema#"
+NUMERIC_TYPES = {XSD + t for t in ("decimal", "integer", "int", "long", "double", "float")}
+DATETIME_TYPES = {XSD + "dateTime", XSD + "date"}
+
+# Human-readable time columns produced by the current KG
+TIME_FORMATS = {
+    "startTime": "%B %d, %Y %H:%M",
+    "endTime": "%B %d, %Y %H:%M",
+    "day": "%B %d, %Y",
+}
+
+# String columns with at most this share of distinct values become categorical
+CATEGORY_RATIO = 0.5
+
+
+def _column_type(bindings, name):
+    datatypes = {row[name].get("datatype") for row in bindings if name in row}
+    if datatypes and datatypes <= NUMERIC_TYPES:
+        return "number"
+    if datatypes and datatypes <= DATETIME_TYPES:
+        return "datetime"
+    return "string"
+
+
+def _typed_column(name, values, kind):
+    column = pa.array(values, type=pa.string())
+    if kind == "number":
+        return pc.cast(column, pa.float64())
+    if kind == "datetime":
+        # xsd:dateTime values may carry a zone; they are stored as naive UTC
+        return pc.cast(pc.strptime(pc.utf8_slice_codeunits(column, 0, 19), format="%Y-%m-%dT%H:%M:%S",
+                                   unit="s", error_is_null=True), pa.timestamp("s"))
+    if name in TIME_FORMATS:
+        return pc.strptime(column, format=TIME_FORMATS[name], unit="s", error_is_null=True)
+    non_null = len(column) - column.null_count
+    if non_null and len(pc.unique(column)) <= CATEGORY_RATIO * non_null:
+        return pc.dictionary_encode(column)
+    return column
+
+
+def bindings_to_table(results):
+    """
+    Build a typed pyarrow Table from a SPARQL JSON result.
+    """
+    variables = results.get("head", {}).get("vars", [])
+    bindings = results.get("results", {}).get("bindings", [])
+    columns = []
+    for name in variables:
+        values = [row[name]["value"] if name in row else None for row in bindings]
+        columns.append(_typed_column(name, values, _column_type(bindings, name)))
+    return pa.table(columns, names=variables)
+
+
+def table_to_bytes(table, file_format="parquet"):
+    """
+    Serialize a table as Parquet or as an Arrow IPC file.
+    """
+    sink = io.BytesIO()
+    if file_format == "arrow":
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pq.write_table(table, sink)
+    return sink.getvalue()
+
+
+def write_parquet(results, path):
+    """
+    Write a SPARQL JSON result as a typed Parquet file, atomically.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # A temp file per call: concurrent writes of one query never share it
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    os.chmod(tmp_path, 0o644)
+    try:
+        pq.write_table(bindings_to_table(results), tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+if __name__ == "__main__":
+    # Convert saved JSON outputs, e.g. for the offline dashboard
+    folder = sys.argv[1]
+    for file_name in sorted(os.listdir(folder)):
+        if file_name.endswith(".json"):
+            with open(os.path.join(folder, file_name), "r", encoding="utf-8") as f:
+                results = json.load(f)
+            path = os.path.join(folder, file_name[:-5] + ".parquet")
+            write_parquet(results, path)
+            print(f"✅ {path}")
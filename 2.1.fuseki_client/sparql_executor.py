@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+    Async SPARQL execution layer
+    Runs queries against Fuseki over a shared keep-alive httpx connection pool,
+    with bounded concurrency, per-query timeouts and cancellation when the
+    HTTP caller goes away.
+"""
+import asyncio
+import httpx
+
+from result_stream import parse_tsv_header, parse_tsv_row
+
+RESULT_FORMATS = {
+    "SELECT": "application/sparql-results+json",
+    "ASK": "application/sparql-results+json",
+    "CONSTRUCT": "text/turtle",
+    "DESCRIBE": "text/turtle",
+}
+
+
+class ClientDisconnected(Exception):
+    """The HTTP client disconnected before the query finished."""
+
+
+class SparqlExecutor:
+    def __init__(self, endpoint, max_concurrency=16, timeout=30.0):
+        self.endpoint = endpoint
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.client = None
+        self._slots = None
+
+    async def start(self):
+        """
+        Open the shared connection pool. Called once from the app lifespan.
+        """
+        limits = httpx.Limits(max_connections=self.max_concurrency,
+                              max_keepalive_connections=self.max_concurrency)
+        # The per-query timeout is enforced in query(); the pool only guards connects
+        self.client = httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(None, connect=10.0))
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def _post(self, query, query_type):
+        headers = {"Accept": RESULT_FORMATS[query_type]}
+        async with self._slots:
+            response = await self.client.post(self.endpoint, data={"query": query}, headers=headers)
+        response.raise_for_status()
+        if query_type in ("SELECT", "ASK"):
+            return response.json()
+        return response.text
+
+    async def query(self, query, query_type="SELECT", timeout=None, request=None):
+        """
+        Execute a query and return the parsed JSON results (SELECT/ASK)
+        or the Turtle text (CONSTRUCT/DESCRIBE).
+        Raises asyncio.TimeoutError after `timeout` seconds and
+        ClientDisconnected if the given Starlette `request` is disconnected.
+        """
+        query_type = query_type.upper()
+        if query_type not in RESULT_FORMATS:
+            raise ValueError("Unsupported query type")
+
+        task = asyncio.ensure_future(
+            asyncio.wait_for(self._post(query, query_type), timeout or self.timeout))
+        if request is None:
+            return await task
+        return await cancel_on_disconnect(request, task)
+
+    async def stream_select(self, query, timeout=None):
+        """
+        Async generator over a SELECT result as it arrives from Fuseki.
+        Yields the list of variable names first, then one SPARQL JSON binding
+        per row. Results are requested as TSV, which is line based, so memory
+        stays constant whatever the result size. The timeout applies to the
+        wait for the response headers, not to the whole transfer.
+        """
+        async with self._slots:
+            request = self.client.build_request(
+                "POST", self.endpoint, data={"query": query},
+                headers={"Accept": "text/tab-separated-values"})
+            response = await asyncio.wait_for(self.client.send(request, stream=True), timeout or self.timeout)
+            try:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+                lines = response.aiter_lines()
+                variables = parse_tsv_header(await lines.__anext__())
+                yield variables
+                async for line in lines:
+                    if line:
+                        yield parse_tsv_row(variables, line)
+            finally:
+                await response.aclose()
+
+
+async def cancel_on_disconnect(request, task, poll_interval=0.25):
+    """
+    Await `task`, cancelling it as soon as the client of `request` disconnects.
+    """
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise ClientDisconnected("Client disconnected, query cancelled")
+    finally:
+        task.cancel()
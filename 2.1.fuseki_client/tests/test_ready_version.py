@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+    /api/ready "version": a restarted client must never hand out a version
+    it already gave out before the restart (the dashboards cache on it).
+"""
+import importlib
+import os
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def start_client(monkeypatch):
+    """
+    A freshly imported client, as after a restart, whose KG load finds the
+    same KG already in Fuseki and every summary saved (no upload, no bump).
+    """
+    sys.modules.pop("fuseki_client_api", None)
+    api = importlib.import_module("fuseki_client_api")
+
+    async def initialize_dataset():
+        api.startup.update(ready=True, status="ready", uploaded=False, dataset="H")
+
+    monkeypatch.setattr(api, "initialize_dataset", initialize_dataset)
+    monkeypatch.setattr(api, "loaded_content_hash", lambda: "H")
+    monkeypatch.setattr(api.views, "refresh", lambda run_select, dataset, names=None: {})
+    return api
+
+
+def ready_version(client):
+    for _ in range(100):
+        response = client.get("/api/ready")
+        if response.status_code == 200:
+            return response.json()["version"]
+        time.sleep(0.01)
+    raise AssertionError("client never became ready")
+
+
+def test_version_is_not_reused_after_restart(monkeypatch):
+    seen = []
+    for _ in range(2):
+        api = start_client(monkeypatch)
+        with TestClient(api.app) as client:
+            for _ in range(2):
+                version = ready_version(client)
+                assert version.startswith("H:")
+                assert version not in seen
+                seen.append(version)
+                # e.g. after a SPARQL Update patch
+                assert client.post("/api/views/refresh").status_code == 200
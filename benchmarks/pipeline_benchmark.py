@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+    ETL pipeline benchmark
+    Runs the KG pipeline stage by stage on synthetic schedules of growing size
+    and records wall time, peak RSS and rows or triples per second for each
+    stage. Every stage runs in a fresh process, so its peak RSS is its own.
+
+    Stages:
+      generate   write the raw synthetic schedule (synthetic_data.py)
+      clean      clean_prices_etl.run_etl
+      map        streaming mapper, or RMLConverter.convert + N-Triples
+                 serialization with --mapper rml (needs pyrml)
+      turtle     parse the KG and pretty-print it as Turtle
+      merge      ontology merge into <workdir>/goski-kg_merged.n3
+      upload     fuseki_client upload_rdf_file into --fuseki, or an
+                 in-process rdflib parse without it
+
+    Usage: python benchmarks/pipeline_benchmark.py -f 10 100 1000 --fuseki http://localhost:3030/dataset
+"""
+import codecs
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+from argparse import ArgumentParser
+
+from rdflib import Graph
+
+from synthetic_data import MAPPING, REPO, clean_schedule, count_lines, map_schedule, merge_ontology, write_schedule
+
+STAGES = ["generate", "clean", "map", "turtle", "merge", "upload"]
+KG = "goski-kg.n3"
+MERGED = "goski-kg_merged.n3"
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if platform.system() == "Darwin" else peak / 1024
+
+
+def stage_generate(workdir, options):
+    _, rows = write_schedule(options["factor"], workdir, options["seed"])
+    return {"rows": rows}
+
+
+def stage_clean(workdir, options):
+    return {"rows": clean_schedule(workdir, options["chunksize"])}
+
+
+def stage_map(workdir, options):
+    if options["mapper"] == "stream":
+        map_schedule(workdir, KG)
+        return {"triples": count_lines(os.path.join(workdir, KG))}
+
+    from pyrml.pyrml_mapper import RMLConverter  # optional, as in the mapping container
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        start = time.perf_counter()
+        g = RMLConverter().convert(MAPPING)
+        convert_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        with codecs.open(KG, "w", encoding="utf8") as out_file:
+            out_file.write(g.serialize(format="nt"))
+        serialize_seconds = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+    return {"triples": len(g), "convert_seconds": round(convert_seconds, 3),
+            "serialize_seconds": round(serialize_seconds, 3)}
+
+
+def stage_turtle(workdir, options):
+    start = time.perf_counter()
+    g = Graph()
+    g.parse(os.path.join(workdir, KG), format="nt")
+    parse_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    with codecs.open(os.path.join(workdir, "goski-kg.ttl"), "w", encoding="utf8") as out_file:
+        out_file.write(g.serialize(format="turtle"))
+    return {"triples": len(g), "parse_seconds": round(parse_seconds, 3),
+            "serialize_seconds": round(time.perf_counter() - start, 3)}
+
+
+def stage_merge(workdir, options):
+    merged = merge_ontology(os.path.join(workdir, KG), os.path.join(workdir, MERGED))
+    return {"triples": count_lines(merged)}
+
+
+def setup_upload(options):
+    """
+    Import the fuseki_client and empty the default graph, outside the timing.
+    """
+    if not options["fuseki"]:
+        return None
+    sys.path.insert(0, os.path.join(REPO, "2.1.fuseki_client"))
+    import fuseki_client_api as api
+
+    # The client talks to the compose host name; point it at the given dataset
+    api.FUSEKI_DATA = options["fuseki"].rstrip("/") + "/data"
+    api.session.delete(api.FUSEKI_DATA, params={"default": ""}).raise_for_status()
+    return api
+
+
+def stage_upload(workdir, options, api=None):
+    path = os.path.join(workdir, MERGED)
+    if api is None:
+        g = Graph()
+        g.parse(path, format="nt")
+        return {"triples": len(g), "target": "rdflib"}
+    return {"triples": api.upload_rdf_file(path), "target": options["fuseki"]}
+
+
+def _run_stage(stage, workdir, options, queue):
+    """
+    Child process entry point: run one stage and report its measurements.
+    """
+    try:
+        setup = globals().get(f"setup_{stage}")
+        args = (setup(options),) if setup else ()
+        baseline = _peak_rss_mb()
+        start = time.perf_counter()
+        result = globals()[f"stage_{stage}"](workdir, options, *args)
+        seconds = time.perf_counter() - start
+        queue.put({"seconds": round(seconds, 3), "peak_rss_mb": round(_peak_rss_mb(), 1),
+                   "baseline_rss_mb": round(baseline, 1), **result})
+    except Exception as e:
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def run_stage(stage, workdir, options):
+    """
+    Run one stage in a fresh process and return its measurements.
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run_stage, args=(stage, workdir, options, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    for unit in ("rows", "triples"):
+        if result.get(unit) and result["seconds"]:
+            result[f"{unit}_per_second"] = round(result[unit] / result["seconds"])
+    return result
+
+
+def print_table(report):
+    print(f"{'factor':>6}  {'stage':<9} {'seconds':>9} {'peak MB':>9} {'rows/triples':>13} {'per second':>12}")
+    for factor, stages in report["factors"].items():
+        for stage, r in stages.items():
+            if "error" in r:
+                print(f"{factor:>6}  {stage:<9} {r['error']}")
+                continue
+            count = r.get("triples", r.get("rows"))
+            rate = r.get("triples_per_second", r.get("rows_per_second"))
+            print(f"{factor:>6}  {stage:<9} {r['seconds']:>9.2f} {r['peak_rss_mb']:>9.1f} "
+                  f"{count or 0:>13,} {rate or 0:>12,}")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("-f", "--factors", type=int, nargs="+", default=[10, 100, 1000],
+                        help="Size multipliers of scheduleFaked.csv (default: 10 100 1000).")
+    parser.add_argument("-s", "--stages", nargs="+", choices=STAGES, default=STAGES,
+                        help="Stages to run, in pipeline order (default: all).")
+    parser.add_argument("--mapper", choices=["stream", "rml"], default="stream",
+                        help="Streaming mapper (default) or pyrml RMLConverter.")
+    parser.add_argument("-c", "--chunksize", type=int, default=None,
+                        help="Clean the schedule in chunks of this many rows.")
+    parser.add_argument("--fuseki", help="Fuseki dataset URL for the upload stage, e.g. http://localhost:3030/dataset.")
+    parser.add_argument("-w", "--workdir", default=os.path.join(REPO, "benchmarks", "work"),
+                        help="Folder for the generated datasets, one x<factor> subfolder each.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-r", "--report", default=os.path.join(REPO, "benchmarks", "reports", "pipeline_benchmark.json"),
+                        help="Where to write the JSON report.")
+    args = parser.parse_args()
+
+    report = {"mapper": args.mapper, "chunksize": args.chunksize, "python": platform.python_version(),
+              "started_at": time.time(), "factors": {}}
+    for factor in args.factors:
+        workdir = os.path.join(args.workdir, f"x{factor}")
+        os.makedirs(workdir, exist_ok=True)
+        options = {"factor": factor, "seed": args.seed, "chunksize": args.chunksize,
+                   "mapper": args.mapper, "fuseki": args.fuseki}
+        stages = report["factors"][factor] = {}
+        for stage in [s for s in STAGES if s in args.stages]:
+            stages[stage] = result = run_stage(stage, workdir, options)
+            if "error" in result:
+                print(f"❌ x{factor} {stage}: {result['error']}")
+                break
+            print(f"✅ x{factor} {stage}: {result['seconds']:.2f}s, peak {result['peak_rss_mb']:.0f} MB")
+
+    print_table(report)
+    os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Report written to {args.report}")
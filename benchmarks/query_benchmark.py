@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+    Query latency benchmark
+    Builds synthetic KGs (see synthetic_data.py), loads each one into a target
+    and runs every named query of files/sparql_queries a number of times at
+    the given concurrency levels. Reports p50/p95/p99 latency and throughput
+    per query, and optionally compares the p95 against a previous report.
+
+    Targets:
+      (default)       in-process rdflib graph, no services needed
+      --fuseki URL    a Fuseki dataset, e.g. http://localhost:3030/dataset
+                      (its default graph is replaced by every dataset)
+      --api URL       the fuseki_client API, e.g. http://localhost:8001,
+                      i.e. /api/query/{name} with its cache and views.
+                      Combined with --fuseki, each dataset is loaded into
+                      Fuseki first and the API views are refreshed.
+
+    Usage: python benchmarks/query_benchmark.py -f 10 100 -c 1 8 -n 50
+"""
+import json
+import os
+import sys
+import threading
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+from rdflib import Graph
+
+from synthetic_data import FILES, REPO, build_kg, count_lines
+
+sys.path.insert(0, os.path.join(REPO, "2.1.fuseki_client"))
+
+from query_registry import QueryRegistry  # noqa: E402
+
+QUERY_DIR = os.path.join(FILES, "sparql_queries")
+PERCENTILES = (50, 95, 99)
+
+
+class RdflibTarget:
+    name = "rdflib"
+
+    def __init__(self):
+        self.graph = None
+        # rdflib graphs are not safe for concurrent queries
+        self._lock = threading.Lock()
+
+    def load(self, path):
+        graph = Graph()
+        graph.parse(path, format="nt")
+        self.graph = graph
+
+    def run(self, named_query):
+        with self._lock:
+            rows = len(self.graph.query(named_query.with_limit(None, named_query.resolve_params({}))))
+        return rows
+
+
+class FusekiTarget:
+    name = "fuseki"
+
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+        self.session = requests.Session()
+
+    def load(self, path):
+        with open(path, "rb") as f:
+            response = self.session.put(f"{self.url}/data", params={"default": ""}, data=f,
+                                        headers={"Content-Type": "application/n-triples"})
+        response.raise_for_status()
+
+    def run(self, named_query):
+        response = self.session.post(f"{self.url}/sparql",
+                                     data={"query": named_query.with_limit(None, named_query.resolve_params({}))},
+                                     headers={"Accept": "application/sparql-results+json"})
+        response.raise_for_status()
+        return len(response.json()["results"]["bindings"])
+
+
+class ApiTarget:
+    name = "api"
+
+    def __init__(self, url, fuseki=None):
+        self.url = url.rstrip("/")
+        self.fuseki = fuseki
+        self.session = requests.Session()
+
+    def load(self, path):
+        if self.fuseki is None:
+            return
+        self.fuseki.load(path)
+        # Recomputes the views and invalidates the result cache
+        self.session.post(f"{self.url}/api/views/refresh").raise_for_status()
+
+    def run(self, named_query):
+        response = self.session.get(f"{self.url}/api/query/{named_query.name}", params={"persist": "false"})
+        response.raise_for_status()
+        body = response.json()
+        if "error" in body:
+            raise RuntimeError(body["error"])
+        return len(body["results"]["results"]["bindings"])
+
+
+def measure(target, named_query, requests_count, concurrency):
+    """
+    Run `named_query` `requests_count` times with `concurrency` threads.
+    Returns latency percentiles (ms), throughput (requests/s), errors and rows.
+    """
+    target.run(named_query)  # warm-up, not measured
+
+    def timed(_):
+        start = time.perf_counter()
+        try:
+            rows = target.run(named_query)
+        except Exception:
+            return None, None
+        return time.perf_counter() - start, rows
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(requests_count)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([latency for latency, _ in results if latency is not None]) * 1000
+    rows = next((rows for _, rows in results if rows is not None), None)
+    stats = {f"p{p}": None for p in PERCENTILES}
+    if latencies.size:
+        stats = {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(latencies, PERCENTILES))}
+    return {
+        **stats,
+        "mean": round(float(latencies.mean()), 2) if latencies.size else None,
+        "throughput": round(latencies.size / elapsed, 2),
+        "errors": requests_count - latencies.size,
+        "rows": rows,
+    }
+
+
+def compare(report, baseline, tolerance):
+    """
+    Runs whose p95 grew by more than `tolerance` (a fraction) since `baseline`.
+    """
+    previous = {(r["factor"], r["concurrency"], r["query"]): r for r in baseline["runs"]}
+    regressions = []
+    for run in report["runs"]:
+        old = previous.get((run["factor"], run["concurrency"], run["query"]))
+        if old and old["p95"] and run["p95"] and run["p95"] > old["p95"] * (1 + tolerance):
+            regressions.append({**run, "baseline_p95": old["p95"]})
+    return regressions
+
+
+def print_table(runs):
+    print(f"{'factor':>6} {'conc':>4}  {'query':<42} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>8} {'err':>4}")
+    for r in runs:
+        p50, p95, p99 = (f"{r[k]:.1f}" if r[k] is not None else "-" for k in ("p50", "p95", "p99"))
+        print(f"{r['factor']:>6} {r['concurrency']:>4}  {r['query']:<42} {p50:>9} {p95:>9} {p99:>9} "
+              f"{r['throughput']:>8.1f} {r['errors']:>4}")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("-f", "--factors", type=int, nargs="+", default=[10, 100, 1000],
+                        help="Size multipliers of scheduleFaked.csv (default: 10 100 1000).")
+    parser.add_argument("-c", "--concurrency", type=int, nargs="+", default=[1, 8],
+                        help="Concurrent clients, one run per value (default: 1 8).")
+    parser.add_argument("-n", "--requests", type=int, default=20, help="Requests per query and run (default: 20).")
+    parser.add_argument("-q", "--queries", nargs="+", help="Only these named queries (default: all .rq files).")
+    parser.add_argument("--fuseki", help="Fuseki dataset URL to load and query, e.g. http://localhost:3030/dataset.")
+    parser.add_argument("--api", help="fuseki_client API URL to query, e.g. http://localhost:8001.")
+    parser.add_argument("-w", "--workdir", default=os.path.join(REPO, "benchmarks", "work"),
+                        help="Folder for the generated datasets; existing ones are reused.")
+    parser.add_argument("--rebuild", action="store_true", help="Regenerate the datasets even if they exist.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-r", "--report", default=os.path.join(REPO, "benchmarks", "reports", "query_benchmark.json"),
+                        help="Where to write the JSON report.")
+    parser.add_argument("-b", "--baseline", help="Previous report to compare the p95 latencies against.")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed p95 growth over the baseline, as a fraction (default: 0.2).")
+    args = parser.parse_args()
+
+    registry = QueryRegistry(QUERY_DIR)
+    registry.refresh()
+    names = args.queries or sorted(registry.queries)
+    queries = [registry.get(name) for name in names if registry.get(name) is not None]
+    skipped = sorted(set(names) - {q.name for q in queries}) + sorted(registry.errors)
+    if skipped:
+        print(f"⚠️ Skipped queries: {', '.join(skipped)}")
+
+    fuseki = FusekiTarget(args.fuseki) if args.fuseki else None
+    target = ApiTarget(args.api, fuseki) if args.api else fuseki or RdflibTarget()
+
+    report = {"target": target.name, "requests": args.requests, "started_at": time.time(), "datasets": {}, "runs": []}
+    for factor in args.factors:
+        workdir = os.path.join(args.workdir, f"x{factor}")
+        merged = os.path.join(workdir, "goski-kg_merged.n3")
+        if args.rebuild or not os.path.isfile(merged):
+            print(f"🔄 Building x{factor} dataset...")
+            build_kg(factor, workdir, args.seed)
+        triples = count_lines(merged)
+
+        start = time.perf_counter()
+        target.load(merged)
+        load_time = time.perf_counter() - start
+        report["datasets"][factor] = {"triples": triples, "load_seconds": round(load_time, 2)}
+        print(f"✅ x{factor}: {triples:,} triples loaded into {target.name} in {load_time:.1f}s")
+
+        for concurrency in args.concurrency:
+            for named_query in queries:
+                try:
+                    stats = measure(target, named_query, args.requests, concurrency)
+                except Exception as e:
+                    print(f"❌ {named_query.name} (x{factor}, {concurrency} clients): {e}")
+                    continue
+                report["runs"].append({"factor": factor, "concurrency": concurrency,
+                                       "query": named_query.name, **stats})
+
+    print_table(report["runs"])
+    os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Report written to {args.report}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"❌ Regression: {r['query']} (x{r['factor']}, {r['concurrency']} clients) "
+                  f"p95 {r['baseline_p95']:.1f} -> {r['p95']:.1f} ms")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No p95 regression over {args.tolerance:.0%}")
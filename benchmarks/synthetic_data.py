@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+    Synthetic GoSki datasets for the benchmarks
+    Scales files/datasources/scheduleFaked.csv by an integer factor and runs
+    it through the same pipeline stages as the mapping container: cleaning,
+    streaming RML mapping and ontology merge.
+
+    Usage: python benchmarks/synthetic_data.py -f 10 100 1000 -o benchmarks/work
+"""
+import os
+import sys
+from argparse import ArgumentParser
+
+import numpy as np
+import pandas as pd
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FILES = os.path.join(REPO, "files")
+sys.path.insert(0, os.path.join(REPO, "1.1.mapping"))
+
+from clean_prices_etl import TIME_FORMAT, load_category_rules, run_etl  # noqa: E402
+from streaming_mapper import prepend_ontology, stream_mapping  # noqa: E402
+
+SOURCE = os.path.join(FILES, "datasources", "scheduleFaked.csv")
+MAPPING = os.path.join(FILES, "mappings", "kg_real_rml.ttl")
+ONTOLOGY = os.path.join(FILES, "ontologies", "ontology.ttl")
+RULES = os.path.join(FILES, "mappings", "class_categories.csv")
+
+# The RML mapping reads this path relative to the working directory
+MAPPING_SOURCE = os.path.join("datasources", "schedule_cleaned.csv")
+
+# Copies are spread over one season so dates grow with the data
+SEASON_DAYS = 120
+
+
+def _display_time(times):
+    # "February 1, 2025 10:00", the format of the export (no zero-padded day)
+    return (times.dt.month_name() + " " + times.dt.day.astype(str) + ", "
+            + times.dt.year.astype(str) + times.dt.strftime(" %H:%M"))
+
+
+def generate_schedule(factor, source=SOURCE, seed=0):
+    """
+    Return `factor` copies of the source schedule as raw (uncleaned) rows.
+    Every copy gets its own appointment IDs and client emails and is shifted
+    by a random number of days within the season, so bookings, clients and
+    dates all grow with the factor. Prices keep their messy export formats.
+    """
+    df = pd.read_csv(source, dtype=str, keep_default_na=False)
+    rows = len(df)
+    out = pd.concat([df] * factor, ignore_index=True)
+    copy = np.repeat(np.arange(factor), rows)
+
+    rng = np.random.default_rng(seed)
+    offsets = rng.integers(0, SEASON_DAYS, factor)
+    offsets[0] = 0  # the first copy is the original schedule
+    shift = pd.to_timedelta(offsets[copy], unit="D")
+    for column in ("Start Time", "End Time"):
+        out[column] = _display_time(pd.to_datetime(out[column], format=TIME_FORMAT) + shift)
+
+    out["Appointment ID"] = (out["Appointment ID"].astype(np.int64) + copy.astype(np.int64) * 10**10).astype(str)
+
+    # The first copy keeps the original clients, later ones get "+<copy>" addresses
+    local, at, domain = (out["Email"].str.partition("@")[i] for i in range(3))
+    suffix = pd.Series(np.where(copy > 0, "+" + copy.astype(str), ""), index=out.index)
+    out["Email"] = local.where(at == "", local + suffix) + at + domain
+    return out
+
+
+def write_schedule(factor, workdir, seed=0):
+    """
+    Write the raw synthetic schedule to <workdir>/datasources/scheduleFaked.csv.
+    """
+    path = os.path.join(workdir, "datasources", "scheduleFaked.csv")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df = generate_schedule(factor, seed=seed)
+    df.to_csv(path, index=False)
+    return path, len(df)
+
+
+def clean_schedule(workdir, chunksize=None):
+    """
+    Price, time and class category cleaning, as clean_prices_etl.py does it.
+    """
+    raw = os.path.join(workdir, "datasources", "scheduleFaked.csv")
+    return run_etl(raw, os.path.join(workdir, MAPPING_SOURCE), chunksize, rules=load_category_rules(RULES))
+
+
+def map_schedule(workdir, output="goski-kg.n3"):
+    """
+    Streaming RML mapping of the cleaned schedule to <workdir>/<output>.
+    """
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        stream_mapping(MAPPING, output)
+    finally:
+        os.chdir(cwd)
+    return os.path.join(workdir, output)
+
+
+def merge_ontology(kg_path, merged_path):
+    """
+    Ontology as N-Triples followed by the KG, with the mapping CLI's own merge.
+    """
+    return prepend_ontology(ONTOLOGY, kg_path, merged_path)
+
+
+def count_lines(path):
+    with open(path, "rb") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def build_kg(factor, workdir, seed=0):
+    """
+    Generate, clean, map and merge a dataset `factor` times the source size.
+    Returns the path of <workdir>/goski-kg_merged.n3.
+    """
+    write_schedule(factor, workdir, seed)
+    clean_schedule(workdir)
+    kg_path = map_schedule(workdir)
+    return merge_ontology(kg_path, os.path.join(workdir, "goski-kg_merged.n3"))
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("-f", "--factors", type=int, nargs="+", default=[10, 100, 1000],
+                        help="Size multipliers of scheduleFaked.csv (default: 10 100 1000).")
+    parser.add_argument("-o", "--output", default=os.path.join(REPO, "benchmarks", "work"),
+                        help="Folder for the generated datasets, one x<factor> subfolder each.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for factor in args.factors:
+        workdir = os.path.join(args.output, f"x{factor}")
+        merged = build_kg(factor, workdir, args.seed)
+        print(f"✅ x{factor}: {count_lines(merged):,} triples in {merged}")
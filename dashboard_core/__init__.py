@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+    Code shared by the GoSki dashboards (2.2.dashboard and dashboard_streamlit):
+    data sources, cached transforms and the dashboard tabs.
+"""
+from dashboard_core.calendar_grid import WEEKDAYS, calendar_grids, revenue_calendar_figure
+from dashboard_core.sources import ApiSource, LocalSource, SnapshotSource, offline_source
+from dashboard_core.app import display_data
+
+__all__ = ["WEEKDAYS", "calendar_grids", "revenue_calendar_figure", "ApiSource", "LocalSource", "SnapshotSource", "offline_source", "display_data"]
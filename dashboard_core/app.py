@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+    Dashboard views
+    Daily appointment activity, top clients by revenue, popular time slots
+    and revenue over time, rendered from the cached frames of a source.
+    Only the selected view runs and loads its datasets.
+"""
+import plotly.express as px
+import streamlit as st
+
+from dashboard_core.calendar_grid import revenue_calendar_figure
+from dashboard_core.data import client_stats, load_datasets, load_filtered
+from dashboard_core.transforms import month_params
+
+
+# ----------------------------
+# 📆 Daily Appointments Chart
+# ----------------------------
+def daily_appointments_tab(source, data):
+    st.header("Daily Appointments")
+
+    df = data["daily_appointments"]
+
+    if df.empty:
+        st.warning("No appointment data found.")
+    else:
+        fig = px.bar(
+            df,
+            x="date_label",
+            y="count",
+            title="Appointments per Day",
+            labels={"count": "Number of Appointments", "date_label": "Date"},
+            template="plotly_white"
+        )
+
+        # Set correct order for x-axis categories
+        fig.update_layout(
+            xaxis=dict(categoryorder="array", categoryarray=df["date_label"]),
+            xaxis_title="Date (Weekday)",
+            yaxis_title="Appointments",
+            height=500
+        )
+
+        st.plotly_chart(fig, use_container_width=True)
+
+
+# ----------------------------
+# 💰 Top Clients by Revenue
+# ----------------------------
+def top_clients_tab(source, data):
+    st.header("Top Clients by Revenue")
+
+    df = data["clients"]
+
+    if df.empty:
+        st.warning("No payment data available.")
+    else:
+        # ----------------------------
+        # 🎛️ Stats Mode Selector
+        # ----------------------------
+        st.markdown("#### 📊 Revenue Statistics per Client")
+
+        stats_mode = st.radio(
+            "Choose how to calculate average and std:",
+            ["All Clients", "Exclude Extreme Values"],
+            horizontal=True
+        )
+
+        trim_percent = None
+        if stats_mode == "Exclude Extreme Values":
+            trim_percent = st.selectbox("Trim top and bottom percent:", [1, 2, 5, 10], index=2)
+
+        mean_paid, std_paid = client_stats(source, df, trim_percent)
+
+        st.markdown(f"#### • **Average Paid per Client:** `{mean_paid:,.0f} NOK`")
+        st.markdown(f"#### • **Standard Deviation:** `{std_paid:,.0f} NOK`")
+
+        # ----------------------------
+        # 📈 Top Clients Chart
+        # ----------------------------
+        top_n = st.slider("Show Top Clients", 3, 150, 10)
+        df_top = df.head(top_n)
+
+        fig = px.bar(
+            df_top,
+            x="email",
+            y="totalPaid",
+            title="Top Paying Clients",
+            labels={"totalPaid": "NOK"},
+            template="plotly_dark"
+        )
+        fig.update_layout(xaxis_tickangle=-45, height=500)
+        st.plotly_chart(fig, use_container_width=True)
+
+
+# ----------------------------
+# 📊 Appointments by Weekday & Hour
+# ----------------------------
+def time_slots_tab(source, data):
+    st.header("🗓️ Distribution of Private/Nordic Lessons by Weekday and Hour")
+
+    # Always the full 7 x 24 grid, computed server-side
+    grouped = data["time_slots"]
+
+    if not grouped["count"].any():
+        st.warning("No appointment data available.")
+    else:
+        fig = px.density_heatmap(
+            grouped,
+            x="weekday",
+            y="hour",
+            z="count",
+            color_continuous_scale="Rainbow",
+            title="Appointments Heatmap: Weekday vs Hour",
+            labels={"weekday": "Weekday", "hour": "Hour of Day", "count": "Appointments"},
+            text_auto=True  # 👈 show counts directly inside cells
+        )
+
+        fig.update_traces(
+            selector=dict(type='heatmap'),
+            showscale=True,
+            xgap=3,  # small horizontal gaps
+            ygap=3,  # small vertical gaps
+            hoverongaps=False,
+            textfont=dict(color="black", size=12),  # nicer text style
+        )
+
+        fig.update_layout(
+            height=600,
+            yaxis=dict(),
+            margin=dict(t=50, l=0, r=0, b=0),
+        )
+
+        st.plotly_chart(fig, use_container_width=True)
+
+
+# ----------------------------
+# 💵 Revenue Over Time
+# ----------------------------
+def revenue_tab(source, data):
+    st.header("Revenue Over Time")
+
+    col1, col2 = st.columns([1, 2])
+
+    # === col1: Course Type Statistics ===
+    with col1:
+        # ----------------------------------
+        # 📅 Month Filter (Toggleable from separate query)
+        # ----------------------------------
+        with st.expander("📂 Filter by Month", expanded=False):
+            # "Month Year" labels of the distinct months, in chronological order
+            selected_month = st.selectbox("Choose month:", ["All"] + data["months"])
+
+        # ----------------------------------
+        # 🏷️ Courses by Type
+        # ----------------------------------
+        st.markdown("### 🏷️ Courses by Type")
+
+        # "All" is loaded with the view; a selected month is fetched on its own
+        if selected_month != "All":
+            st.markdown(f"Filtered by month: **{selected_month}**")
+            df_courses = load_filtered(source, "courses", month_params(selected_month))
+        else:
+            df_courses = data["courses"]
+
+        if df_courses.empty:
+            st.info("No courses found by course type.")
+        else:
+            fig = px.bar(
+                df_courses,
+                x="totalCourses",
+                y="normalizedLabel",
+                orientation="h",
+                title="Courses Held (Grouped)",
+                labels={"totalCourses": "Courses", "normalizedLabel": "Course Type"},
+                template="plotly_white",
+                height=350
+            )
+
+            fig.update_layout(
+                margin=dict(t=40, l=20, r=20, b=40),
+                yaxis=dict(tickfont=dict(size=12)),
+                xaxis_title="Number of Courses",
+                yaxis_title=""
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+        # ----------------------------------
+        # 💰 Revenue by Course Type
+        # ----------------------------------
+        st.markdown("### 💰 Revenue by Course Type")
+
+        if selected_month != "All":
+            df_revenue = load_filtered(source, "revenue_by_type", month_params(selected_month))
+        else:
+            df_revenue = data["revenue_by_type"]
+
+        if df_revenue.empty:
+            st.info("No revenue data found by course type.")
+        else:
+            total_sum = df_revenue["totalEarned"].sum()
+            st.markdown(f"#### 🧾 Total Revenue: `{total_sum:,.0f} NOK`")
+
+            for label, total in zip(df_revenue["normalizedLabel"], df_revenue["totalEarned"]):
+                st.markdown(f"#### &nbsp;&nbsp;&nbsp;&nbsp;• **{label}**: `{total:,.0f} NOK`", unsafe_allow_html=True)
+
+    # === col2: Revenue Visualization ===
+    with col2:
+        df = data["daily_revenue"]
+
+        if df.empty:
+            st.warning("No revenue data found.")
+        else:
+            # Toggle between views
+            view_mode = st.radio("📊 Choose View", ["Area Chart", "Calendar Heatmap"], horizontal=True)
+
+            if view_mode == "Area Chart":
+                fig = px.area(
+                    df,
+                    x="x_label",
+                    y="totalPaid",
+                    title="Daily Revenue (NOK)",
+                    labels={"totalPaid": "NOK"},
+                    template="plotly_white"
+                )
+
+                fig.update_layout(
+                    xaxis_title="Date & Weekday",
+                    yaxis_title="Total Paid",
+                    height=500
+                )
+                st.plotly_chart(fig, use_container_width=True)
+
+            else:
+                st.subheader("🗓️ Calendar Heatmap View")
+                fig = revenue_calendar_figure(df["date"], df["totalPaid"])
+                st.plotly_chart(fig, use_container_width=True)
+
+
+# Views: label -> (render function, datasets it reads)
+TABS = {
+    "📆 Daily Appointments": (daily_appointments_tab, ["daily_appointments"]),
+    "💰 Top Clients": (top_clients_tab, ["clients"]),
+    "🕒 Popular Time Slots": (time_slots_tab, ["time_slots"]),
+    "💵 Revenue Over Time": (revenue_tab, ["months", "courses", "revenue_by_type", "daily_revenue"]),
+}
+TAB_KEY = "dashboard_tab"
+
+
+def display_data(source, lazy=True):
+    """
+    Render the dashboard views. With lazy (the default) a selector replaces
+    the tabs and only the selected view is fetched and drawn; st.tabs would
+    run every tab's code on each rerun. The selection is kept in the
+    session state, so it survives widget reruns.
+    """
+    st.title("📊 GoSki Dashboard")
+
+    if lazy:
+        label = st.radio("View", list(TABS), horizontal=True, key=TAB_KEY, label_visibility="collapsed")
+        render, keys = TABS[label]
+        render(source, load_datasets(source, keys))
+        return
+
+    # Every view at once: all datasets up front
+    data = load_datasets(source)
+    for tab, (render, _) in zip(st.tabs(list(TABS)), TABS.values()):
+        with tab:
+            render(source, data)
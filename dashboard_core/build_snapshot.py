@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+    Bundle the saved query outputs of a folder into one snapshot file
+    (see snapshot.py), e.g. for the offline dashboard.
+
+    Usage: python -m dashboard_core.build_snapshot dashboard_streamlit/outputs
+"""
+import os
+from argparse import ArgumentParser
+
+from dashboard_core.snapshot import SNAPSHOT_NAME
+from dashboard_core.sources import bundle_outputs
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("directory", help="Folder with the saved query outputs (<name>.parquet or <name>.json).")
+    parser.add_argument("-o", "--output", help=f"Bundle path (default: <directory>/{SNAPSHOT_NAME}).")
+    args = parser.parse_args()
+
+    path, count = bundle_outputs(args.directory, args.output)
+    print(f"✅ {count} query outputs bundled in {path} ({os.path.getsize(path):,} bytes)")
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+    Calendar heatmap grids
+    Lays daily values out as one week x weekday grid per month. Week rows and
+    weekday columns are computed for all dates at once and the values are
+    scattered into a single (months, 6, 7) array, instead of filtering the
+    DataFrame once per calendar day.
+"""
+import calendar
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# A month spans at most 6 Monday-first weeks
+MAX_WEEKS = 6
+
+
+def calendar_grids(dates, values, active_only=True):
+    """
+    Build Monday-first calendar grids, like calendar.monthcalendar, filled
+    with the values of each date (several values on one date are summed).
+    With active_only, months without a positive value are left out.
+    Returns a list of (year, month, grid) in date order, grid shaped (weeks, 7).
+    """
+    dates = pd.DatetimeIndex(pd.to_datetime(dates)).normalize()
+    values = np.asarray(values, dtype=float)
+    keep = ~(dates.isna() | np.isnan(values))
+    dates, values = dates[keep], values[keep]
+
+    month_keys = dates.year.to_numpy() * 12 + dates.month.to_numpy() - 1
+    candidates = month_keys[values > 0] if active_only else month_keys
+    months = np.unique(candidates)
+    in_months = np.isin(month_keys, months)
+    dates, values, month_keys = dates[in_months], values[in_months], month_keys[in_months]
+
+    # Weekday (0 = Monday) of the first day of every month, and its week count
+    firsts = pd.to_datetime({"year": months // 12, "month": months % 12 + 1, "day": 1})
+    first_weekdays = firsts.dt.weekday.to_numpy()
+    weeks = (firsts.dt.days_in_month.to_numpy() + first_weekdays + 6) // 7
+
+    month_idx = np.searchsorted(months, month_keys)
+    week_idx = (dates.day.to_numpy() - 1 + first_weekdays[month_idx]) // 7
+    grid = np.zeros((len(months), MAX_WEEKS, 7))
+    np.add.at(grid, (month_idx, week_idx, dates.weekday.to_numpy()), values)
+
+    return [(int(key // 12), int(key % 12 + 1), grid[i, :weeks[i]]) for i, key in enumerate(months)]
+
+
+def revenue_calendar_figure(dates, values, cols=3, title="📆 Revenue Calendar (Shared Scale)"):
+    """
+    One heatmap subplot per active month, on a shared color scale.
+    """
+    grids = calendar_grids(dates, values)
+    values = pd.to_numeric(pd.Series(values), errors="coerce")
+    rows = max((len(grids) + cols - 1) // cols, 1)
+
+    fig = make_subplots(
+        rows=rows, cols=cols,
+        subplot_titles=[f"{calendar.month_name[m]} {y}" for y, m, _ in grids],
+        horizontal_spacing=0.05, vertical_spacing=0.12
+    )
+    for i, (_, _, grid) in enumerate(grids):
+        fig.add_trace(
+            go.Heatmap(
+                z=grid,
+                x=WEEKDAYS,
+                y=[f"Week {w+1}" for w in range(len(grid))],
+                colorscale="Reds",
+                zmin=values.min(),
+                zmax=values.max(),
+                showscale=(i == len(grids) - 1),
+                colorbar=dict(title="NOK", len=0.5, x=1.03)
+            ),
+            row=i // cols + 1, col=i % cols + 1
+        )
+
+    fig.update_layout(
+        height=rows * 300,
+        title_text=title,
+        margin=dict(t=60, l=20, r=20, b=20),
+        template="plotly_white"
+    )
+    return fig
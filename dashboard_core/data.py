@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+    Cached dashboard data
+    The transformed frames are kept with st.cache_resource, keyed on the
+    source and its dataset version: a new KG is picked up, an unchanged one
+    is fetched and transformed only once, and every session and rerun gets
+    the same read-only frames (no pickled copy per call or per session).
+    Datasets are loaded per view: only what the selected view reads.
+"""
+import pandas as pd
+import streamlit as st
+
+from dashboard_core import transforms
+
+# Dashboard datasets: key -> (named query request, transform)
+DATASETS = {
+    "daily_appointments": ({"name": "daily_appointment_count_by_date"}, transforms.daily_appointments),
+    "clients": ({"name": "total_paid_by_user"}, transforms.clients_by_revenue),
+    "time_slots": ({"name": "appointments_by_weekday_hour"}, transforms.weekday_hour_counts),
+    "months": ({"name": "available_months_by_date"}, transforms.month_options),
+    "courses": ({"name": "courses_per_type_in_range"}, transforms.courses_by_type),
+    "revenue_by_type": ({"name": "revenue_per_class_type_in_range"}, transforms.revenue_by_type),
+    "daily_revenue": ({"name": "revenue_per_day_by_date"}, transforms.daily_revenue),
+}
+
+# How often the dataset version is checked again (seconds)
+VERSION_TTL = 30
+# Cached frames kept per loader; older versions are evicted first
+MAX_DATASETS = 32
+MAX_FILTERED = 64
+
+
+@st.cache_data(ttl=VERSION_TTL, show_spinner=False)
+def _dataset_version(_source, source_key):
+    return _source.version()
+
+
+def dataset_version(source):
+    """
+    The current dataset version of `source`. Stops the script run with an
+    error message when the source cannot be reached (e.g. fuseki_client is
+    restarting); the next rerun tries again.
+    """
+    try:
+        return _dataset_version(source, source.key)
+    except Exception as e:
+        st.error(f"Data source unavailable: {e}")
+        st.stop()
+
+
+@st.cache_resource(max_entries=MAX_DATASETS, show_spinner="Loading data...")
+def _load_datasets(_source, source_key, version, keys):
+    frames, errors = _source.fetch_many({key: DATASETS[key][0] for key in keys})
+    # Raising keeps a partly failed batch out of the cache
+    if errors:
+        raise RuntimeError("; ".join(f"{key}: {error}" for key, error in errors.items()))
+    return {key: DATASETS[key][1](frame) for key, frame in frames.items()}
+
+
+@st.cache_resource(max_entries=MAX_DATASETS, show_spinner=False)
+def _load_dataset(_source, source_key, version, key):
+    query, transform = DATASETS[key]
+    return transform(_source.fetch(query["name"], query.get("limit"), query.get("params")))
+
+
+@st.cache_resource(max_entries=MAX_FILTERED, show_spinner=False)
+def _load_filtered(_source, source_key, version, key, params):
+    query, transform = DATASETS[key]
+    return transform(_source.fetch(query["name"], query.get("limit"), dict(params)))
+
+
+@st.cache_data(show_spinner=False)
+def _client_stats(_clients, source_key, version, trim_percent):
+    return transforms.revenue_stats(_clients, trim_percent)
+
+
+class Datasets(dict):
+    """
+    Transformed datasets of one source version for one script run. A dataset
+    is loaded when first read; prefetch() loads several at once. The frames
+    themselves are the shared cached ones.
+    """
+
+    def __init__(self, source, version):
+        super().__init__()
+        self.source = source
+        self.version = version
+
+    def prefetch(self, keys):
+        """
+        Load the missing `keys` together, in one /api/batch round trip for
+        the API. If the batch fails, each dataset is loaded on its own by
+        __missing__, which reports the ones that fail.
+        """
+        missing = tuple(key for key in keys if key not in self)
+        if not missing or not self.source.batch:
+            return
+        try:
+            self.update(_load_datasets(self.source, self.source.key, self.version, missing))
+        except Exception:
+            pass
+
+    def __missing__(self, key):
+        try:
+            value = _load_dataset(self.source, self.source.key, self.version, key)
+        except Exception as e:
+            st.error(f"Query '{DATASETS[key][0]['name']}' failed: {e}")
+            return DATASETS[key][1](pd.DataFrame())
+        self[key] = value
+        return value
+
+
+def load_datasets(source, keys=None):
+    """
+    The datasets of the current version of `source`, with `keys` (all
+    datasets by default) prefetched. Failed queries are reported, come back
+    empty and are retried on the next rerun.
+    """
+    data = Datasets(source, dataset_version(source))
+    data.prefetch(DATASETS if keys is None else keys)
+    return data
+
+
+def load_filtered(source, key, params):
+    """
+    The dataset `key` for explicit query parameters, e.g. one month.
+    """
+    version = dataset_version(source)
+    try:
+        return _load_filtered(source, source.key, version, key, tuple(sorted(params.items())))
+    except Exception as e:
+        st.error(f"Query '{DATASETS[key][0]['name']}' failed: {e}")
+        return DATASETS[key][1](pd.DataFrame())
+
+
+def client_stats(source, clients, trim_percent=None):
+    """
+    Mean and standard deviation of the client totals for a trim percent.
+    """
+    return _client_stats(clients, source.key, dataset_version(source), trim_percent)
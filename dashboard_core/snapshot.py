@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+    Snapshot bundle of query outputs
+    All saved query results in one file: one Arrow IPC file per query, laid
+    end to end (64-byte aligned), followed by a JSON index and a footer.
+    The reader memory-maps the bundle and opens a table from a zero-copy
+    slice only when it is first asked for, so startup does not parse every
+    output and the OS shares the mapped pages between sessions.
+
+    Layout: [IPC file]... [JSON index: name -> (offset, length, rows)] [index length, u64 LE] [MAGIC]
+
+    Built with: python -m dashboard_core.build_snapshot dashboard_streamlit/outputs
+    (the offline dashboard also builds it at startup when it is missing or stale)
+"""
+import json
+import os
+import struct
+import tempfile
+import threading
+
+import pyarrow as pa
+
+MAGIC = b"GOSKISNAP1"
+ALIGNMENT = 64
+SNAPSHOT_NAME = "snapshot.arrow"
+
+
+def write_snapshot(tables, path):
+    """
+    Write name -> pyarrow Table as a snapshot bundle, atomically.
+    """
+    index = {}
+    # A temp file per call: concurrent builds of one bundle never share it
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    os.chmod(tmp_path, 0o644)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for name, table in tables.items():
+                offset = f.tell()
+                with pa.ipc.new_file(f, table.schema) as writer:
+                    writer.write_table(table)
+                index[name] = [offset, f.tell() - offset, table.num_rows]
+                f.write(b"\0" * (-f.tell() % ALIGNMENT))
+            footer = json.dumps(index).encode()
+            f.write(footer)
+            f.write(struct.pack("<Q", len(footer)))
+            f.write(MAGIC)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return index
+
+
+class Snapshot:
+    """
+    Lazy reader of a snapshot bundle.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._buffer = None
+        self._index = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        with self._lock:
+            if self._buffer is None:
+                buffer = pa.memory_map(self.path, "r").read_buffer()
+                tail = len(MAGIC) + 8
+                if buffer.size < tail or buffer.slice(buffer.size - len(MAGIC)).to_pybytes() != MAGIC:
+                    raise ValueError(f"Not a snapshot bundle: {self.path}")
+                (length,) = struct.unpack("<Q", buffer.slice(buffer.size - tail, 8).to_pybytes())
+                self._index = json.loads(buffer.slice(buffer.size - tail - length, length).to_pybytes())
+                self._buffer = buffer
+        return self._buffer
+
+    def names(self):
+        self._open()
+        return list(self._index)
+
+    def __contains__(self, name):
+        self._open()
+        return name in self._index
+
+    def read_table(self, name):
+        """
+        The table `name` as a pyarrow Table backed by the mapped file.
+        """
+        buffer = self._open()
+        offset, length, _ = self._index[name]
+        return pa.ipc.open_file(buffer.slice(offset, length)).read_all()
+
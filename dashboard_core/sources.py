@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+    Dashboard data sources
+    Both dashboards read named query results as DataFrames through one of
+    these backends: saved outputs in a local folder or a snapshot bundle of
+    them (dashboard_streamlit), or the fuseki_client API (2.2.dashboard).
+    A source also reports a dataset version, which changes whenever the
+    underlying KG does.
+"""
+import base64
+import io
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import requests
+
+from dashboard_core.snapshot import SNAPSHOT_NAME, Snapshot, write_snapshot
+
+# Arrow-backed pandas dtype of snapshot string columns (zero-copy from the mapped pages)
+ARROW_STRINGS = {pa.string(): pd.StringDtype("pyarrow"), pa.large_string(): pd.StringDtype("pyarrow")}
+
+# Month-filtered queries answered locally from the per-start-time outputs:
+# name -> (saved query, value column, result column)
+RANGE_QUERIES = {
+    "courses_per_type_in_range": ("courses_per_type_with_startTime", "totalCourses", "totalCourses"),
+    "revenue_per_class_type_in_range": ("revenue_per_class_type_with_startTime", "amount", "totalEarned"),
+}
+
+# Weekday x hour counts answered locally from the raw start times
+WEEKDAY_HOUR_QUERY = ("appointments_by_weekday_hour", "appointment_time_distribution")
+
+
+class LocalSource:
+    """
+    Query outputs saved by fuseki_client (/api/query writes <name>.json and
+    <name>.parquet). Parquet files are preferred and memory-mapped.
+    """
+
+    # Outputs are read one by one, when a view needs them
+    batch = False
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.key = f"local:{os.path.abspath(directory)}"
+
+    def version(self):
+        # Newest modification time of the saved outputs
+        return str(max((entry.stat().st_mtime_ns for entry in os.scandir(self.directory)
+                        if entry.name.endswith((".json", ".parquet"))), default=0))
+
+    def _has(self, name):
+        path = os.path.join(self.directory, name)
+        return os.path.exists(path + ".parquet") or os.path.exists(path + ".json")
+
+    def _read(self, name):
+        path = os.path.join(self.directory, name)
+        if os.path.exists(path + ".parquet"):
+            return pd.read_parquet(path + ".parquet", memory_map=True)
+        with open(path + ".json", "r", encoding="utf-8") as f:
+            bindings = json.load(f).get("results", {}).get("bindings", [])
+        return pd.DataFrame([{k: v["value"] for k, v in row.items()} for row in bindings])
+
+    def _range(self, name, params):
+        """
+        Sum the per-start-time output of a *_in_range query over [from, to).
+        """
+        saved, column, result = RANGE_QUERIES[name]
+        df = self._read(saved)
+        if df.empty:
+            return pd.DataFrame(columns=["normalizedLabel", result])
+        start = pd.to_datetime(df["startTime"], errors="coerce")
+        keep = pd.Series(True, index=df.index)
+        if params.get("from"):
+            keep &= start >= pd.Timestamp(params["from"])
+        if params.get("to"):
+            keep &= start < pd.Timestamp(params["to"])
+        if params.get("classType"):
+            keep &= df["normalizedLabel"].astype(str) == params["classType"]
+        values = pd.to_numeric(df.loc[keep, column], errors="coerce").fillna(0)
+        return (values.groupby(df.loc[keep, "normalizedLabel"], observed=True).sum()
+                .rename(result).reset_index()
+                .sort_values(result, ascending=False, ignore_index=True))
+
+    def _weekday_hour(self, params):
+        """
+        Count the saved start times per ISO weekday and hour over [from, to).
+        The saved output has no class type, so it cannot be filtered on one.
+        """
+        if params.get("classType"):
+            raise ValueError("the saved start times cannot be filtered by class type")
+        df = self._read(WEEKDAY_HOUR_QUERY[1])
+        if df.empty:
+            return pd.DataFrame(columns=["weekday", "hour", "count"])
+        start = pd.to_datetime(df["startTime"], errors="coerce").dropna()
+        if params.get("from"):
+            start = start[start >= pd.Timestamp(params["from"])]
+        if params.get("to"):
+            start = start[start < pd.Timestamp(params["to"])]
+        return (pd.DataFrame({"weekday": start.dt.dayofweek + 1, "hour": start.dt.hour})
+                .value_counts(sort=False).rename("count").reset_index()
+                .sort_values(["weekday", "hour"], ignore_index=True))
+
+    def fetch(self, name, limit=None, params=None):
+        if name in RANGE_QUERIES and not self._has(name):
+            df = self._range(name, params or {})
+        elif name == WEEKDAY_HOUR_QUERY[0] and not self._has(name):
+            df = self._weekday_hour(params or {})
+        else:
+            df = self._read(name)
+        return df.head(limit) if limit else df
+
+    def fetch_many(self, queries):
+        """
+        key -> {"name", "limit", "params"} to (key -> DataFrame, key -> error).
+        """
+        frames, errors = {}, {}
+        for key, query in queries.items():
+            try:
+                frames[key] = self.fetch(query["name"], query.get("limit"), query.get("params"))
+            except Exception as e:
+                frames[key], errors[key] = pd.DataFrame(), str(e)
+        return frames, errors
+
+
+class SnapshotSource(LocalSource):
+    """
+    Query outputs from a memory-mapped snapshot bundle (see snapshot.py).
+    Each table is read on first use, straight from the mapped pages; strings
+    stay Arrow-backed instead of becoming Python objects. When an output next
+    to the bundle is newer than the bundle, the outputs are read instead, so
+    a stale bundle never shadows them.
+    """
+
+    def __init__(self, path):
+        super().__init__(os.path.dirname(os.path.abspath(path)))
+        self.path = path
+        self.key = f"snapshot:{os.path.abspath(path)}"
+        self.snapshot = Snapshot(path)
+
+    def _stale(self):
+        return int(LocalSource.version(self)) > os.stat(self.path).st_mtime_ns
+
+    def version(self):
+        if self._stale():
+            return f"outputs-{LocalSource.version(self)}"
+        stat = os.stat(self.path)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def _has(self, name):
+        if self._stale():
+            return super()._has(name)
+        return name in self.snapshot
+
+    def _read(self, name):
+        if self._stale():
+            return super()._read(name)
+        return self.snapshot.read_table(name).to_pandas(types_mapper=ARROW_STRINGS.get)
+
+
+def bundle_outputs(directory, path=None):
+    """
+    Bundle every saved output of `directory` into a snapshot file, by default
+    <directory>/snapshot.arrow. Returns the bundle path and the table count.
+    """
+    source = LocalSource(directory)
+    names = sorted({os.path.splitext(entry)[0] for entry in os.listdir(directory)
+                    if entry.endswith((".parquet", ".json"))})
+    tables = {name: pa.Table.from_pandas(source.fetch(name), preserve_index=False) for name in names}
+    path = path or os.path.join(directory, SNAPSHOT_NAME)
+    write_snapshot(tables, path)
+    return path, len(tables)
+
+
+def offline_source(directory):
+    """
+    Source for the outputs of `directory`: their snapshot bundle, built first
+    when it is missing or older than the outputs, or the outputs themselves
+    when the bundle cannot be written (e.g. a read-only folder).
+    """
+    path = os.path.join(directory, SNAPSHOT_NAME)
+    try:
+        if not os.path.exists(path) or SnapshotSource(path)._stale():
+            bundle_outputs(directory, path)
+    except OSError as e:
+        print(f"⚠️ Snapshot bundle not built, reading the outputs: {e}")
+        return LocalSource(directory)
+    return SnapshotSource(path)
+
+
+class ApiSource:
+    """
+    Typed Parquet results from the fuseki_client API: several queries in one
+    /api/batch round trip, single (filtered) queries through /api/table.
+    """
+
+    # The datasets of a view are fetched in one /api/batch request
+    batch = True
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.key = self.base_url
+        # One keep-alive connection pool per source
+        self.session = requests.Session()
+
+    def version(self):
+        # Changes with every KG load or view refresh in the client, None until it is ready
+        return self.session.get(f"{self.base_url}/api/ready").json().get("version")
+
+    def fetch(self, name, limit=None, params=None):
+        query_params = dict(params or {})
+        if limit:
+            query_params["limit"] = limit
+        response = self.session.get(f"{self.base_url}/api/table/{name}", params=query_params)
+        response.raise_for_status()
+        return pd.read_parquet(io.BytesIO(response.content))
+
+    def fetch_many(self, queries):
+        """
+        key -> {"name", "limit", "params"} to (key -> DataFrame, key -> error).
+        """
+        payload = {"format": "parquet", "queries": [dict(query, key=key) for key, query in queries.items()]}
+        response = self.session.post(f"{self.base_url}/api/batch", json=payload)
+        response.raise_for_status()
+        frames, errors = {}, {}
+        for key, entry in response.json()["results"].items():
+            if "error" in entry:
+                frames[key], errors[key] = pd.DataFrame(), entry["error"]
+            else:
+                frames[key] = pd.read_parquet(io.BytesIO(base64.b64decode(entry["parquet"])))
+        return frames, errors
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+    Dashboard transforms
+    Turn raw query results into the frames the tabs plot. They only depend
+    on the query result, so they run once per dataset version (see data.py)
+    and never on a widget change. Callers must not modify the returned frames.
+"""
+import pandas as pd
+
+WEEKDAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def _dates(df):
+    return pd.to_datetime(df[["year", "month", "day"]].astype(int))
+
+
+def daily_appointments(df):
+    """
+    Appointments per day, labeled like 'Sat Dec 14'. Fuseki returns the days in order.
+    """
+    if df.empty:
+        return df
+    out = pd.DataFrame({"date": _dates(df), "count": pd.to_numeric(df["count"], errors="coerce")})
+    out["date_label"] = out["date"].dt.strftime("%a %b %d")
+    return out
+
+
+def clients_by_revenue(df):
+    """
+    Clients with their total paid, highest first.
+    """
+    if df.empty:
+        return df
+    out = df.assign(totalPaid=pd.to_numeric(df["totalPaid"], errors="coerce"))
+    return out.sort_values("totalPaid", ascending=False).reset_index(drop=True)
+
+
+def revenue_stats(clients, trim_percent=None):
+    """
+    Mean and standard deviation of the paid totals, optionally without the
+    top and bottom `trim_percent` percent.
+    """
+    paid = clients["totalPaid"]
+    if trim_percent:
+        lower, upper = paid.quantile([trim_percent / 100, 1 - trim_percent / 100])
+        paid = paid[(paid >= lower) & (paid <= upper)]
+    return paid.mean(), paid.std()
+
+
+def weekday_hour_counts(df):
+    """
+    The full weekday (Monday first) x hour grid of appointment counts, from
+    the per-(weekday, hour) rows of appointments_by_weekday_hour. Slots
+    without appointments count 0, so the frame always has 7 x 24 rows.
+    """
+    grid = pd.MultiIndex.from_product([range(1, 8), range(24)], names=["weekday", "hour"])
+    if df.empty:
+        counts = pd.Series(0, index=grid)
+    else:
+        # An empty GROUP BY may still come back as one unbound row
+        rows = df[["weekday", "hour", "count"]].apply(pd.to_numeric, errors="coerce").dropna()
+        counts = (rows.astype(int).groupby(["weekday", "hour"])["count"].sum()
+                  .reindex(grid, fill_value=0))
+    out = counts.rename("count").reset_index()
+    out["weekday"] = pd.Categorical.from_codes(out["weekday"] - 1, categories=WEEKDAY_ORDER, ordered=True)
+    return out
+
+
+def month_options(df):
+    """
+    'Month Year' labels of the distinct months, already sorted by Fuseki.
+    """
+    if df.empty:
+        return []
+    months = pd.to_datetime(df[["year", "month"]].astype(int).assign(day=1))
+    return months.dt.strftime("%B %Y").tolist()
+
+
+def month_params(selected_month):
+    """
+    Query parameters of a 'Month Year' label: [first day of the month, first day of the next).
+    """
+    month_start = pd.to_datetime(selected_month, format="%B %Y")
+    return {"from": month_start.isoformat(), "to": (month_start + pd.offsets.MonthBegin(1)).isoformat()}
+
+
+def courses_by_type(df):
+    """
+    Courses per type, smallest first so the largest bar ends up on top.
+    """
+    if df.empty:
+        return df
+    out = df.assign(totalCourses=pd.to_numeric(df["totalCourses"], errors="coerce").fillna(0))
+    return out.sort_values("totalCourses", ascending=True)
+
+
+def revenue_by_type(df):
+    """
+    Online revenue per type, already summed and sorted by Fuseki.
+    """
+    if df.empty:
+        return df
+    return df.assign(totalEarned=pd.to_numeric(df["totalEarned"], errors="coerce").fillna(0))
+
+
+def daily_revenue(df):
+    """
+    Revenue per day with a two-line 'Mon\\nApr 25' axis label.
+    """
+    if df.empty:
+        return df
+    out = pd.DataFrame({"date": _dates(df), "totalPaid": pd.to_numeric(df["totalPaid"], errors="coerce").fillna(0)})
+    out["x_label"] = out["date"].dt.strftime("%a") + "\n" + out["date"].dt.strftime("%b %d")
+    return out